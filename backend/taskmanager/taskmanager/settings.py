@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,6 +45,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tasks.instrumentation.RequestTimingMiddleware',
+    'tasks.compression.CompressionMiddleware',
+    'tasks.routers.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,13 +79,53 @@ WSGI_APPLICATION = 'taskmanager.wsgi.application'
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "tasks.authentication.ClaimsJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
+    "DEFAULT_PAGINATION_CLASS": "tasks.pagination.CreatedAtCursorPagination",
+    "PAGE_SIZE": 50,
+    # orjson-backed when installed, DRF's own classes otherwise.
+    "DEFAULT_RENDERER_CLASSES": (
+        "tasks.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "tasks.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+}
+
+SIMPLE_JWT = {
+    "TOKEN_OBTAIN_SERIALIZER": "tasks.authentication.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "tasks.authentication.ClaimsTokenRefreshSerializer",
 }
 
+# Seconds a user's resolved group names stay cached (see tasks/roles.py).
+TASKS_ROLE_CACHE_TIMEOUT = 300
+
+# The TASKS_* dicts below are optional. Each module keeps its defaults in
+# DEFAULTS and merges in only the keys given here, so list overrides only.
+
+# Opt-in per-request SQL/auth/serializer timing (see tasks/instrumentation.py).
+# TASKS_REQUEST_TIMING = {"ENABLED": True, "SAMPLE_RATE": 0.1}
+
+# Accept-Encoding negotiated response compression (see tasks/compression.py).
+# TASKS_COMPRESSION = {"ENCODINGS": ["gzip"]}
+
+# Background job queue (tasks/jobs.py) and the client request intake it runs.
+# TASKS_JOBS = {"BATCH_SIZE": 100, "MAX_ATTEMPTS": 5}
+# TASKS_INTAKE = {"DEFAULT_DEPARTMENT": "Intake"}
+
+# Automatic assignment of new tasks to the least-loaded user (tasks/assignment.py).
+# When on, creates that leave out assigned_to get an assignee instead of None.
+# TASKS_ASSIGNMENT = {"AUTO_ASSIGN": True}
+
+# Retention for task comments and logs (see tasks/archive.py).
+# TASKS_ARCHIVE = {"AFTER_DAYS": 180}
+
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
@@ -97,6 +141,31 @@ DATABASES = {
     }
 }
 
+# The cache holds the table versions behind list ETags (tasks/conditional.py),
+# cached roles (tasks/roles.py), replica pins (tasks/routers.py) and the
+# archive schedule, so every process serving the app must share it. Set
+# REDIS_URL (and install the ``redis`` package) for any multi-process
+# deployment; ``manage.py check --deploy`` warns otherwise (tasks.W002).
+# Without it each process keeps its own cache, which suits runserver.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+            "KEY_PREFIX": "taskmanager",
+        }
+    }
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+DATABASE_ROUTERS = ["tasks.routers.ReplicaRouter"]
+
+# Aliases from DATABASES that serve safe-method API reads (tasks/routers.py).
+TASKS_REPLICA_DATABASES = []
+
+# Seconds a user keeps reading from the primary after writing.
+TASKS_REPLICA_PIN_SECONDS = 5
+
 
 
 # Password validation
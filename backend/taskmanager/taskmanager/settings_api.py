@@ -0,0 +1,47 @@
+"""
+API-only settings profile for workers that serve JWT-authenticated JSON.
+
+Serve it through ``taskmanager.wsgi_api`` or ``taskmanager.asgi_api``, or
+set ``DJANGO_SETTINGS_MODULE=taskmanager.settings_api``. It leaves out the
+admin, sessions, messages, static files and templates, and the middleware
+that only browser traffic needs. CSRF protection goes too, because
+requests authenticate with a bearer token rather than a cookie. Run
+management commands and migrations with the full ``taskmanager.settings``.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK
+
+BROWSER_APPS = {
+    "django.contrib.admin",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "rest_framework.authtoken",
+}
+BROWSER_MIDDLEWARE = {
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+}
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in BROWSER_APPS]
+MIDDLEWARE = [name for name in MIDDLEWARE if name not in BROWSER_MIDDLEWARE]
+
+ROOT_URLCONF = "taskmanager.urls_api"
+WSGI_APPLICATION = "taskmanager.wsgi_api.application"
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_AUTHENTICATION_CLASSES": (
+        "tasks.authentication.ClaimsJWTAuthentication",
+    ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "tasks.renderers.FastJSONRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "tasks.renderers.FastJSONParser",
+    ),
+}
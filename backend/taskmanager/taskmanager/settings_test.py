@@ -0,0 +1,16 @@
+"""
+Settings for the test suite:
+``manage.py test --settings=taskmanager.settings_test``.
+"""
+from .settings import *  # noqa: F401,F403
+
+# Two SQLite aliases, so the suite needs no database server and the
+# replica routing tests run against a real second database. The router
+# stays off (TASKS_REPLICA_DATABASES is empty); those tests enable it.
+DATABASES = {
+    "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"},
+    "replica": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"},
+}
+
+# Tests get a private in-memory cache, whatever REDIS_URL says.
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
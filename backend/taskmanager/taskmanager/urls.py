@@ -1,13 +1,9 @@
 from django.contrib import admin
-from django.urls import path, include
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
+from django.urls import path
+
+from . import urls_api
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("api/", include("tasks.urls")),
-    path("api/token/", TokenObtainPairView.as_view()),
-    path("api/token/refresh/", TokenRefreshView.as_view()),
+    *urls_api.urlpatterns,
 ]
@@ -0,0 +1,16 @@
+"""
+WSGI config for the API-only profile (see settings_api.py).
+
+It exposes the WSGI callable as a module-level variable named ``application``.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/6.0/howto/deployment/wsgi/
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'taskmanager.settings_api')
+
+application = get_wsgi_application()
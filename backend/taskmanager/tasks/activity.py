@@ -0,0 +1,98 @@
+"""
+Per-task activity counters: Task.comment_count, log_count and
+last_activity_at.
+
+They are adjusted with ``F()`` updates as comments and log entries are
+written, so concurrent writers never lose increments, and they count
+archived rows too (archiving moves history, it does not remove it).
+``manage.py repair_task_activity`` recomputes them from the history
+tables and fixes any that drifted, e.g. after rows were deleted in the
+admin.
+"""
+from django.db.models import Count, DateTimeField, F, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Task, TaskComment, TaskCommentArchive, TaskLog, TaskLogArchive
+
+FIELDS = ("comment_count", "log_count", "last_activity_at")
+
+
+def _later(at):
+    at = Value(at, output_field=DateTimeField())
+    return Greatest(Coalesce(F("last_activity_at"), at), at)
+
+
+def comment_added(comment):
+    Task.objects.filter(pk=comment.task_id).update(
+        comment_count=F("comment_count") + 1,
+        last_activity_at=_later(comment.created_at),
+    )
+
+
+def logs_added(entries):
+    """Apply a batch of new TaskLog rows with one UPDATE statement."""
+    per_task = {}
+    for entry in entries:
+        count, last = per_task.get(entry.task_id, (0, entry.created_at))
+        per_task[entry.task_id] = (count + 1, max(last, entry.created_at))
+    Task.objects.bulk_update(
+        [
+            Task(pk=pk, log_count=F("log_count") + count, last_activity_at=_later(last))
+            for pk, (count, last) in per_task.items()
+        ],
+        ["log_count", "last_activity_at"],
+    )
+
+
+def _aggregate(model, function, field):
+    rows = (
+        model.objects.filter(task=OuterRef("pk"))
+        .order_by()
+        .values("task")
+        .annotate(value=function(field))
+        .values("value")
+    )
+    return Subquery(rows)
+
+
+def with_expected(queryset):
+    """
+    Annotate ``expected_<field>`` for each counter, computed from the hot
+    and archive history tables.
+    """
+    def total(*sources):
+        return sum(
+            (Coalesce(_aggregate(m, Count, "pk"), 0) for m in sources), Value(0)
+        )
+
+    def latest(*sources):
+        return Greatest(
+            F("created_at"),
+            *(Coalesce(_aggregate(m, Max, "created_at"), F("created_at")) for m in sources),
+        )
+
+    return queryset.annotate(
+        expected_comment_count=total(TaskComment, TaskCommentArchive),
+        expected_log_count=total(TaskLog, TaskLogArchive),
+        expected_last_activity_at=latest(
+            TaskComment, TaskCommentArchive, TaskLog, TaskLogArchive
+        ),
+    )
+
+
+def drifted(queryset):
+    return with_expected(queryset).exclude(
+        Q(comment_count=F("expected_comment_count"))
+        & Q(log_count=F("expected_log_count"))
+        & Q(last_activity_at=F("expected_last_activity_at"))
+    )
+
+
+def repair(queryset, batch_size=1000):
+    """Rewrite counters that differ from the history; return the ids fixed."""
+    tasks = list(drifted(queryset).only("pk"))
+    for task in tasks:
+        for field in FIELDS:
+            setattr(task, field, getattr(task, f"expected_{field}"))
+    Task.objects.bulk_update(tasks, FIELDS, batch_size=batch_size)
+    return [task.pk for task in tasks]
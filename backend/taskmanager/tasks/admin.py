@@ -1,4 +1,22 @@
+"""
+Admin for tables that run to millions of rows.
+
+- Changelists don't count the whole table. ``EstimatedCountPaginator``
+  takes the planner's row estimate for an unfiltered list. With
+  ``show_full_result_count`` off, a filtered list isn't counted a second
+  time for the "N total" link.
+- Foreign keys use raw id or autocomplete widgets, so change forms never
+  render a <select> with every user or task.
+- ``list_select_related`` joins the foreign keys that ``list_display``
+  shows. Default ordering and ``date_hierarchy`` follow the
+  (created_at, id) indexes.
+"""
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from . import search
 from .models import (
     Department,
     Task,
@@ -6,11 +24,172 @@ from .models import (
     ClientRequest,
     TaskComment,
     TaskLog,
+    TaskCommentArchive,
+    TaskLogArchive,
+    Job,
+    AssigneeLoad,
 )
 
-admin.site.register(Department)
-admin.site.register(Task)
-admin.site.register(Client)
-admin.site.register(ClientRequest)
-admin.site.register(TaskComment)
-admin.site.register(TaskLog)
+
+def estimated_count(model, using):
+    """The planner's row count for ``model``'s table, or None if it has none."""
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+        elif connection.vendor == "mysql":
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = %s",
+                [table],
+            )
+        elif connection.vendor == "sqlite":
+            # Only exists once ANALYZE has run; "stat" starts with the row count.
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None:
+        return None
+    count = int(str(row[0]).split()[0])
+    # PostgreSQL reports -1 for a table that was never analyzed.
+    return count if count >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Use the table estimate for unfiltered lists larger than ``threshold``."""
+    threshold = 10_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.threshold:
+                return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+class FullTextSearchMixin:
+    """Search box backed by tasks/search.py instead of ``icontains`` scans."""
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return search.search(queryset, search_term), False
+
+
+@admin.register(Department)
+class DepartmentAdmin(admin.ModelAdmin):
+    search_fields = ["name"]
+    ordering = ["name"]
+
+
+@admin.register(Client)
+class ClientAdmin(LargeTableAdmin):
+    list_display = ["name", "department", "created_at"]
+    search_fields = ["name"]
+    ordering = ["name"]
+
+
+@admin.register(ClientRequest)
+class ClientRequestAdmin(FullTextSearchMixin, LargeTableAdmin):
+    list_display = ["id", "client", "category", "submitted_at"]
+    list_select_related = ["client"]
+    list_filter = ["category"]
+    autocomplete_fields = ["client"]
+    date_hierarchy = "submitted_at"
+    ordering = ["-submitted_at", "-id"]
+    search_fields = ["description"]
+
+
+@admin.register(Task)
+class TaskAdmin(FullTextSearchMixin, LargeTableAdmin):
+    list_display = [
+        "id", "title", "status", "department", "assigned_to", "created_at", "last_activity_at",
+    ]
+    list_select_related = ["department", "assigned_to"]
+    list_filter = ["status", "department"]
+    autocomplete_fields = ["department", "created_by", "assigned_to"]
+    raw_id_fields = ["client_request"]
+    readonly_fields = Task.ACTIVITY_FIELDS
+    date_hierarchy = "created_at"
+    ordering = ["-created_at", "-id"]
+    search_fields = ["title"]
+
+    def save_model(self, request, obj, form, change):
+        obj._audit_user = request.user
+        super().save_model(request, obj, form, change)
+
+
+@admin.register(TaskComment)
+class TaskCommentAdmin(LargeTableAdmin):
+    list_display = ["id", "task", "user", "created_at"]
+    list_select_related = ["task", "user"]
+    raw_id_fields = ["task"]
+    autocomplete_fields = ["user"]
+    date_hierarchy = "created_at"
+    ordering = ["-created_at", "-id"]
+
+
+@admin.register(TaskLog)
+class TaskLogAdmin(LargeTableAdmin):
+    list_display = ["id", "task", "user", "action_type", "old_value", "new_value", "created_at"]
+    list_select_related = ["task", "user"]
+    list_filter = ["action_type"]
+    raw_id_fields = ["task"]
+    autocomplete_fields = ["user"]
+    date_hierarchy = "created_at"
+    ordering = ["-created_at", "-id"]
+
+
+class ArchiveAdmin(LargeTableAdmin):
+    """Archived history is read-only; rows are moved here by archive.py."""
+    list_select_related = ["task", "user"]
+    raw_id_fields = ["task", "user"]
+    ordering = ["-id"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(TaskCommentArchive)
+class TaskCommentArchiveAdmin(ArchiveAdmin):
+    list_display = ["id", "task", "user", "created_at"]
+
+
+@admin.register(TaskLogArchive)
+class TaskLogArchiveAdmin(ArchiveAdmin):
+    list_display = ["id", "task", "user", "action_type", "created_at"]
+
+
+@admin.register(Job)
+class JobAdmin(LargeTableAdmin):
+    list_display = ["id", "kind", "status", "attempts", "run_after", "locked_by"]
+    list_filter = ["status"]
+    ordering = ["-id"]
+
+
+@admin.register(AssigneeLoad)
+class AssigneeLoadAdmin(admin.ModelAdmin):
+    """Toggle ``accepting`` to take a user out of automatic assignment."""
+    list_display = ["user", "department", "open_count", "accepting"]
+    list_editable = ["accepting"]
+    list_select_related = ["user", "department"]
+    list_filter = ["accepting", "department"]
+    autocomplete_fields = ["user", "department"]
+    readonly_fields = ["open_count"]
+    ordering = ["department", "open_count", "user"]
@@ -0,0 +1,160 @@
+"""
+Retention for task history.
+
+Comments and log entries older than ``TASKS_ARCHIVE["AFTER_DAYS"]`` are
+moved, in batches, into TaskCommentArchive / TaskLogArchive, keeping
+their ids and timestamps. ``history()`` reads a task's rows from both
+tables as one ordered sequence, so the list endpoints and their cursors
+do not change when rows move.
+
+``manage.py run_worker`` calls ``run_if_due()`` whenever its queue is
+empty; it runs at most once per ``INTERVAL_SECONDS`` across processes
+sharing the cache. Deployments without a worker run
+``manage.py archive_task_history`` from cron instead, e.g.
+``15 * * * *``.
+"""
+import heapq
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import TaskComment, TaskCommentArchive, TaskLog, TaskLogArchive
+
+DEFAULTS = {
+    "AFTER_DAYS": 180,
+    "BATCH_SIZE": 1000,
+    "INTERVAL_SECONDS": 3600,
+}
+
+ARCHIVES = {
+    TaskComment: TaskCommentArchive,
+    TaskLog: TaskLogArchive,
+}
+
+DUE_KEY = "tasks:archive:due"
+
+
+def config():
+    return {**DEFAULTS, **getattr(settings, "TASKS_ARCHIVE", {})}
+
+
+class History:
+    """
+    The hot and archived rows of one model behind the slice of the
+    QuerySet API that the paginators use (filter, order_by, values,
+    select_related, slicing, sync and async iteration).
+
+    Each slice fetches up to ``stop`` rows from every table and merges
+    them on the ordering, which must run in a single direction.
+    """
+
+    def __init__(self, querysets, start=0, stop=None):
+        self.querysets = querysets
+        self.start, self.stop = start, stop
+
+    def _chain(self, method, *args, **kwargs):
+        return History([getattr(qs, method)(*args, **kwargs) for qs in self.querysets])
+
+    def filter(self, *args, **kwargs):
+        return self._chain("filter", *args, **kwargs)
+
+    def order_by(self, *fields):
+        return self._chain("order_by", *fields)
+
+    def values(self, *fields):
+        return self._chain("values", *fields)
+
+    def select_related(self, *fields):
+        return self._chain("select_related", *fields)
+
+    def __getitem__(self, k):
+        if not isinstance(k, slice) or k.step is not None:
+            raise TypeError("History only supports slicing without a step.")
+        start = self.start + (k.start or 0)
+        stop = None if k.stop is None else self.start + k.stop
+        if self.stop is not None:
+            stop = self.stop if stop is None else min(stop, self.stop)
+        return History(self.querysets, start, stop)
+
+    def _sliced(self):
+        if self.stop is None:
+            return self.querysets
+        return [qs[:self.stop] for qs in self.querysets]
+
+    def _merge(self, results):
+        ordering = self.querysets[0].query.order_by
+        if ordering:
+            names = [f.lstrip("-") for f in ordering]
+            descending = ordering[0].startswith("-")
+
+            def key(row):
+                if isinstance(row, dict):
+                    return tuple(row[name] for name in names)
+                return tuple(getattr(row, name) for name in names)
+
+            merged = heapq.merge(*results, key=key, reverse=descending)
+        else:
+            merged = (row for rows in results for row in rows)
+        return islice(merged, self.start, self.stop)
+
+    def __iter__(self):
+        return self._merge([list(qs) for qs in self._sliced()])
+
+    async def __aiter__(self):
+        results = [[row async for row in qs] for qs in self._sliced()]
+        for row in self._merge(results):
+            yield row
+
+    def count(self):
+        return sum(qs.count() for qs in self.querysets)
+
+
+def history(model, **filters):
+    """Rows of ``model`` matching ``filters`` from the hot and archive tables."""
+    return History([
+        model.objects.filter(**filters),
+        ARCHIVES[model].objects.filter(**filters),
+    ])
+
+
+def archive_model(model, before, batch_size):
+    """Move rows of ``model`` created before ``before``; return how many moved."""
+    archive = ARCHIVES[model]
+    columns = [f.attname for f in archive._meta.concrete_fields]
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                model.objects.filter(created_at__lt=before)
+                .order_by("pk")
+                .values(*columns)[:batch_size]
+            )
+            if not rows:
+                return moved
+            archive.objects.bulk_create([archive(**row) for row in rows])
+            model.objects.filter(pk__in=[row["id"] for row in rows]).delete()
+        moved += len(rows)
+
+
+def run(after_days=None, batch_size=None):
+    """Archive every model in ``ARCHIVES``; return {model name: rows moved}."""
+    options = config()
+    before = timezone.now() - timedelta(
+        days=options["AFTER_DAYS"] if after_days is None else after_days
+    )
+    batch_size = batch_size or options["BATCH_SIZE"]
+    return {
+        model.__name__: archive_model(model, before, batch_size)
+        for model in ARCHIVES
+    }
+
+
+def run_if_due():
+    """``run()`` unless another process ran it within INTERVAL_SECONDS."""
+    if not cache.add(DUE_KEY, True, config()["INTERVAL_SECONDS"]):
+        return None
+    return run()
@@ -0,0 +1,193 @@
+"""
+Load-aware automatic assignment.
+
+AssigneeLoad keeps one row per (department, user) with that user's count
+of OPEN and IN_PROGRESS tasks in the department. Task signals and the
+bulk write paths adjust it with ``F()`` updates, the way stats.py keeps
+TaskStat. A new task without an assignee goes to the department's
+least-loaded accepting user, which is the first entry of
+``assigneeload_pick_idx``: one index seek, however many tasks or users
+there are. Assigning a batch reads the ``k`` lowest rows once and hands
+out its ``k`` tasks from a heap.
+
+A user becomes a candidate in a department when they join it with
+``manage.py join_department`` (``join()``) or through the admin, or when
+a task there is first assigned to them. Automatic assignment is off
+unless ``TASKS_ASSIGNMENT["AUTO_ASSIGN"]`` is set; then a create that
+leaves out ``assigned_to`` gets an assignee.
+
+Two concurrent creates may pick the same user. The counts stay exact,
+and the next pick sees the updated load. ``manage.py
+rebuild_assignee_load`` reconciles the table with Task.
+"""
+import heapq
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db.models import Count, F
+
+from .models import AssigneeLoad, Task
+
+ACTIVE_STATUSES = ("OPEN", "IN_PROGRESS")
+
+DEFAULTS = {
+    "AUTO_ASSIGN": False,
+}
+
+
+def config():
+    return {**DEFAULTS, **getattr(settings, "TASKS_ASSIGNMENT", {})}
+
+
+def _slot(state):
+    """The (department_id, user_id) a task counts towards, or None."""
+    if state is None or state["assigned_to_id"] is None:
+        return None
+    if state["status"] not in ACTIVE_STATUSES:
+        return None
+    return state["department_id"], state["assigned_to_id"]
+
+
+def diff(before, after):
+    """Load deltas for a task moving between two ``stats.values()`` states."""
+    deltas = Counter()
+    for sign, state in ((-1, before), (1, after)):
+        slot = _slot(state)
+        if slot is not None:
+            deltas[slot] += sign
+    return deltas
+
+
+def apply(deltas):
+    for (department_id, user_id), delta in deltas.items():
+        if not delta:
+            continue
+        rows = AssigneeLoad.objects.filter(department_id=department_id, user_id=user_id)
+        if rows.update(open_count=F("open_count") + delta) or delta < 0:
+            # A missing row on decrement means it was deleted along with
+            # its user or department.
+            continue
+        AssigneeLoad.objects.bulk_create(
+            [AssigneeLoad(department_id=department_id, user_id=user_id)],
+            ignore_conflicts=True,
+        )
+        rows.update(open_count=F("open_count") + delta)
+
+
+def join(department_id, user_ids):
+    """
+    Make ``user_ids`` candidates in a department. Existing rows keep their
+    count and ``accepting`` flag; new rows start from the user's open
+    tasks there. Returns the number of rows created.
+    """
+    existing = set(
+        AssigneeLoad.objects.filter(department_id=department_id, user_id__in=user_ids)
+        .values_list("user_id", flat=True)
+    )
+    live = dict(
+        Task.objects.filter(
+            department_id=department_id, assigned_to_id__in=user_ids, status__in=ACTIVE_STATUSES
+        )
+        .order_by()
+        .values("assigned_to_id")
+        .annotate(n=Count("id"))
+        .values_list("assigned_to_id", "n")
+    )
+    rows = [
+        AssigneeLoad(department_id=department_id, user_id=pk, open_count=live.get(pk, 0))
+        for pk in dict.fromkeys(user_ids)
+        if pk not in existing
+    ]
+    AssigneeLoad.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
+
+
+def candidates(department_id, limit):
+    """The ``limit`` least-loaded accepting users as ``(open_count, user_id)``."""
+    return list(
+        AssigneeLoad.objects.filter(
+            department_id=department_id, accepting=True, user__is_active=True
+        )
+        .order_by("open_count", "user_id")
+        .values_list("open_count", "user_id")[:limit]
+    )
+
+
+def pick(department_id):
+    rows = candidates(department_id, 1)
+    return rows[0][1] if rows else None
+
+
+def assign(tasks):
+    """
+    Set ``assigned_to_id`` on unsaved, unassigned ``tasks``, spreading each
+    department's tasks over its least-loaded users. One query per
+    department. The counters are updated once the tasks are saved.
+    """
+    by_department = defaultdict(list)
+    for task in tasks:
+        if task.assigned_to_id is None and task.status in ACTIVE_STATUSES:
+            by_department[task.department_id].append(task)
+
+    for department_id, pending in by_department.items():
+        # Only the len(pending) lowest rows can win within len(pending) picks.
+        heap = candidates(department_id, len(pending))
+        if not heap:
+            continue
+        heapq.heapify(heap)
+        for task in pending:
+            load, user_id = heapq.heappop(heap)
+            task.assigned_to_id = user_id
+            heapq.heappush(heap, (load + 1, user_id))
+    return tasks
+
+
+def live_loads(task_model=Task):
+    """``{(department_id, user_id): count}`` computed with GROUP BY on Task."""
+    rows = (
+        task_model.objects.filter(assigned_to__isnull=False, status__in=ACTIVE_STATUSES)
+        .order_by()
+        .values("department_id", "assigned_to_id")
+        .annotate(n=Count("id"))
+    )
+    return {(row["department_id"], row["assigned_to_id"]): row["n"] for row in rows}
+
+
+def rebuild(load_model=AssigneeLoad, task_model=Task):
+    """
+    Rewrite every count from ``live_loads()``. Rows with no open tasks are
+    kept at zero, so their users stay candidates. Returns the number of
+    rows changed.
+    """
+    live = live_loads(task_model)
+    changed = []
+    for row in load_model.objects.all():
+        count = live.pop((row.department_id, row.user_id), 0)
+        if row.open_count != count:
+            row.open_count = count
+            changed.append(row)
+    load_model.objects.bulk_update(changed, ["open_count"], batch_size=1000)
+    load_model.objects.bulk_create(
+        [
+            load_model(department_id=department_id, user_id=user_id, open_count=count)
+            for (department_id, user_id), count in live.items()
+        ],
+        batch_size=1000,
+    )
+    return len(changed) + len(live)
+
+
+def mismatches():
+    """``[(department_id, user_id, stored, actual)]`` for rows out of sync."""
+    live = live_loads()
+    stored = {
+        (department_id, user_id): count
+        for department_id, user_id, count in AssigneeLoad.objects.values_list(
+            "department_id", "user_id", "open_count"
+        )
+    }
+    return sorted(
+        (*key, stored.get(key, 0), live.get(key, 0))
+        for key in stored.keys() | live.keys()
+        if stored.get(key, 0) != live.get(key, 0)
+    )
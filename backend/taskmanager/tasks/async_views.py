@@ -0,0 +1,182 @@
+"""
+Async read-only variants of the task endpoints, mounted under ``async/``.
+
+Under ASGI these run on the event loop with Django's async ORM, so a request
+waiting on the database does not hold a worker thread. Responses match the
+sync endpoints except for pagination, which is forward-only keyset paging
+on (created_at, id).
+"""
+import base64
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from . import archive
+from .authentication import ClaimsJWTAuthentication
+from .models import Task, TaskComment, TaskLog
+from .renderers import FastJSONRenderer
+from .serializers import TaskCommentSerializer, TaskLogSerializer, TaskSerializer
+
+
+def _json(data, status=200):
+    return HttpResponse(
+        FastJSONRenderer().render(data), status=status, content_type="application/json"
+    )
+
+
+async def authenticate(request):
+    """
+    JWT bearer token first, then the session; ``None`` if neither. The
+    API-only profile (taskmanager/settings_api.py) has no session.
+    """
+    jwt = ClaimsJWTAuthentication()
+    header = jwt.get_header(request)
+    if header is not None:
+        try:
+            # get_raw_token raises AuthenticationFailed for a header that
+            # isn't "<type> <token>".
+            raw_token = jwt.get_raw_token(header)
+            if raw_token is not None:
+                return await jwt.aget_user(jwt.get_validated_token(raw_token))
+        except (AuthenticationFailed, InvalidToken, TokenError, KeyError, User.DoesNotExist):
+            return None
+
+    if not hasattr(request, "auser"):
+        return None
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+class AsyncKeysetPagination:
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    cursor_query_param = "cursor"
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.GET[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, obj):
+        raw = f"{obj.created_at.isoformat()}|{obj.pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, value):
+        created_at, pk = base64.urlsafe_b64decode(value.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(pk)
+
+    async def paginate(self, request, queryset):
+        """Return ``(rows, next_url)``; raise ValueError on a bad cursor."""
+        size = self.get_page_size(request)
+        cursor = request.GET.get(self.cursor_query_param)
+        if cursor:
+            created_at, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+            )
+        rows = [
+            obj async for obj in queryset.order_by("-created_at", "-pk")[:size + 1]
+        ]
+        if len(rows) <= size:
+            return rows, None
+
+        rows = rows[:size]
+        query = request.GET.copy()
+        query[self.cursor_query_param] = self.encode_cursor(rows[-1])
+        return rows, request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+
+
+class AsyncAPIView(View):
+    http_method_names = ["get"]
+    permission_classes = [IsAuthenticated]
+
+    async def check_permissions(self, request):
+        for permission in [cls() for cls in self.permission_classes]:
+            check = getattr(permission, "ahas_permission", None)
+            if check is not None:
+                allowed = await check(request, self)
+            else:
+                allowed = permission.has_permission(request, self)
+            if not allowed:
+                return False
+        return True
+
+    async def get(self, request, *args, **kwargs):
+        request.user = await authenticate(request)
+        if request.user is None:
+            return _json(
+                {"detail": "Authentication credentials were not provided."}, 401
+            )
+        if not await self.check_permissions(request):
+            return _json(
+                {"detail": "You do not have permission to perform this action."}, 403
+            )
+        return await self.aget(request, *args, **kwargs)
+
+
+class AsyncListView(AsyncAPIView):
+    queryset = None
+    serializer_class = None
+    pagination_class = AsyncKeysetPagination
+
+    def get_queryset(self):
+        """``queryset``, re-evaluated per request; override to filter by the URL."""
+        if self.queryset is None:
+            raise ImproperlyConfigured(
+                f"{type(self).__name__} must set queryset or override get_queryset()."
+            )
+        return self.queryset.all()
+
+    async def aget(self, request, *args, **kwargs):
+        try:
+            rows, next_url = await self.pagination_class().paginate(
+                request, self.get_queryset()
+            )
+        except ValueError:
+            return _json({"detail": "Invalid cursor"}, 404)
+        return _json({
+            "next": next_url,
+            "results": self.serializer_class(rows, many=True).data,
+        })
+
+
+class AsyncTaskListView(AsyncListView):
+    queryset = Task.objects.select_related("created_by")
+    serializer_class = TaskSerializer
+
+
+class AsyncTaskDetailView(AsyncAPIView):
+    async def aget(self, request, pk):
+        try:
+            task = await Task.objects.select_related("created_by").aget(pk=pk)
+        except Task.DoesNotExist:
+            return _json({"detail": "No Task matches the given query."}, 404)
+        return _json(TaskSerializer(task).data)
+
+
+class AsyncTaskCommentListView(AsyncListView):
+    serializer_class = TaskCommentSerializer
+
+    def get_queryset(self):
+        return archive.history(
+            TaskComment, task_id=self.kwargs["task_id"]
+        ).select_related("user")
+
+
+class AsyncTaskLogListView(AsyncListView):
+    serializer_class = TaskLogSerializer
+
+    def get_queryset(self):
+        return archive.history(
+            TaskLog, task_id=self.kwargs["task_id"]
+        ).select_related("user")
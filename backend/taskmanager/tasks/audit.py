@@ -0,0 +1,87 @@
+import threading
+from contextlib import contextmanager
+from functools import partial
+
+from django.db import transaction
+
+from . import activity
+from .models import TaskLog
+
+# Task fields that produce a TaskLog row when they change.
+TRACKED_FIELDS = {
+    "status": "STATUS_CHANGE",
+    "assigned_to_id": "ASSIGNMENT_CHANGE",
+}
+
+# Values remembered when a Task is loaded; the dashboard counters in
+# stats.py also need the previous department.
+SNAPSHOT_FIELDS = (*TRACKED_FIELDS, "department_id")
+
+_local = threading.local()
+
+
+def snapshot(task):
+    # Read from __dict__ so deferred fields are not loaded just for auditing.
+    task._audit_snapshot = {
+        field: task.__dict__[field]
+        for field in SNAPSHOT_FIELDS
+        if field in task.__dict__
+    }
+
+
+def changes(task, user=None):
+    """Build (unsaved) TaskLog rows for tracked fields changed since load."""
+    before = getattr(task, "_audit_snapshot", None)
+    if before is None:
+        return []
+
+    entries = []
+    for field, action_type in TRACKED_FIELDS.items():
+        if field not in before or field not in task.__dict__:
+            continue
+        old, new = before[field], task.__dict__[field]
+        if old == new:
+            continue
+        entries.append(TaskLog(
+            task_id=task.pk,
+            user=user,
+            action_type=action_type,
+            old_value="" if old is None else str(old),
+            new_value="" if new is None else str(new),
+        ))
+    return entries
+
+
+def _insert(entries):
+    TaskLog.objects.bulk_create(entries)
+    activity.logs_added(entries)
+
+
+def record(entries):
+    """
+    Queue TaskLog rows to be inserted once the current transaction commits.
+
+    Inside ``collect()`` the rows are held back and written with a single
+    bulk insert when the block exits.
+    """
+    if not entries:
+        return
+    pending = getattr(_local, "pending", None)
+    if pending is not None:
+        pending.extend(entries)
+    else:
+        transaction.on_commit(partial(_insert, entries))
+
+
+@contextmanager
+def collect():
+    if getattr(_local, "pending", None) is not None:
+        yield
+        return
+
+    _local.pending = pending = []
+    try:
+        yield
+    finally:
+        _local.pending = None
+    record(pending)
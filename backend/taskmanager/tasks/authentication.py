@@ -0,0 +1,176 @@
+"""
+JWT authentication that trusts identity claims carried in the token.
+
+Access tokens issued by ``ClaimsTokenObtainPairSerializer`` embed the
+username, the user's roles and a per-user token version. While that
+version matches the user's TokenVersion row, ``ClaimsJWTAuthentication``
+builds the user from the claims, so authenticating and checking roles
+need no user or group query. Changing a user's groups, saving or
+deleting the user bumps the version (see signals.py); older tokens then
+fall back to the regular database lookup until they are refreshed.
+
+The row is the source of truth and is read from the primary database.
+The shared cache only saves that read: a revoke drops the cached copy
+once it commits, and a lost or evicted copy is read again.
+"""
+import uuid
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import TokenVersion
+from .roles import get_roles
+
+VERSION_KEY = "tasks:token-version:{}"
+# Bounds how long a copy read just before a revoke committed can linger.
+VERSION_TIMEOUT = 300
+
+USERNAME_CLAIM = "username"
+# UserSerializer renders id, username and email; tokens assert all three.
+EMAIL_CLAIM = "email"
+ROLES_CLAIM = "roles"
+VERSION_CLAIM = "ver"
+
+
+def _new_version():
+    return uuid.uuid4().hex[:12]
+
+
+def token_version(user_id):
+    """The version to put in a new token, created on the user's first login."""
+    row, _ = TokenVersion.objects.using(DEFAULT_DB_ALIAS).get_or_create(
+        user_id=user_id, defaults={"version": _new_version()}
+    )
+    return row.version
+
+
+def _stored(user_id):
+    # Never a replica: a lagging one would keep trusting revoked tokens.
+    return (
+        TokenVersion.objects.using(DEFAULT_DB_ALIAS)
+        .filter(user_id=user_id)
+        .values_list("version", flat=True)
+    )
+
+
+def current_version(user_id):
+    """The version tokens must carry, or None if none was ever issued."""
+    key = VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = _stored(user_id).first()
+        if version is not None:
+            cache.add(key, version, VERSION_TIMEOUT)
+    return version
+
+
+async def acurrent_version(user_id):
+    key = VERSION_KEY.format(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        version = await _stored(user_id).afirst()
+        if version is not None:
+            await cache.aadd(key, version, VERSION_TIMEOUT)
+    return version
+
+
+def revoke(*user_ids):
+    """Stop trusting the claims in tokens already issued to these users."""
+    TokenVersion.objects.using(DEFAULT_DB_ALIAS).filter(user_id__in=user_ids).update(
+        version=_new_version()
+    )
+    transaction.on_commit(
+        partial(cache.delete_many, [VERSION_KEY.format(pk) for pk in user_ids]),
+        using=DEFAULT_DB_ALIAS,
+    )
+
+
+def add_claims(token, user):
+    token[USERNAME_CLAIM] = user.get_username()
+    token[EMAIL_CLAIM] = user.email
+    token[ROLES_CLAIM] = sorted(get_roles(user))
+    token[VERSION_CLAIM] = token_version(user.pk)
+    return token
+
+
+def user_from_claims(token):
+    """
+    An unsaved-looking ``User`` carrying only what the token asserts.
+
+    It can be assigned to foreign keys and compared by pk, and its id,
+    username and email rendered, but it must never be saved: every other
+    field holds its default.
+    """
+    user = User(
+        **{jwt_settings.USER_ID_FIELD: token[jwt_settings.USER_ID_CLAIM]},
+        username=token[USERNAME_CLAIM],
+        email=token[EMAIL_CLAIM],
+        is_active=True,
+    )
+    user._state.adding = False
+    user._state.db = DEFAULT_DB_ALIAS
+    user.roles = frozenset(token[ROLES_CLAIM])
+    return user
+
+
+def _has_claims(token):
+    # Tokens issued before a claim was added fall back to the database.
+    return all(c in token for c in (USERNAME_CLAIM, EMAIL_CLAIM, ROLES_CLAIM, VERSION_CLAIM))
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        try:
+            # simplejwt looks the user up too, without catching DoesNotExist.
+            data = super().validate(attrs)
+        except User.DoesNotExist:
+            raise InvalidToken("User not found or inactive.")
+        # Refresh tokens live for days; re-read the roles and version
+        # instead of copying the claims they were issued with.
+        access = AccessToken(data["access"], verify=False)
+        user = User.objects.filter(
+            **{jwt_settings.USER_ID_FIELD: access[jwt_settings.USER_ID_CLAIM]}
+        ).first()
+        if user is None or not user.is_active:
+            raise InvalidToken("User not found or inactive.")
+        data["access"] = str(add_claims(access, user))
+        return data
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if not _has_claims(validated_token):
+            return super().get_user(validated_token)
+
+        current = current_version(validated_token[jwt_settings.USER_ID_CLAIM])
+        if current == validated_token[VERSION_CLAIM]:
+            return user_from_claims(validated_token)
+        return super().get_user(validated_token)
+
+    async def aget_user(self, validated_token):
+        """Async counterpart of ``get_user`` for the async views."""
+        user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        if _has_claims(validated_token):
+            if await acurrent_version(user_id) == validated_token[VERSION_CLAIM]:
+                return user_from_claims(validated_token)
+
+        user = await User.objects.aget(**{jwt_settings.USER_ID_FIELD: user_id})
+        if not user.is_active:
+            return None
+        return user
@@ -0,0 +1,23 @@
+"""
+Side effects for Task rows written with ``bulk_create``, which skips the
+post_save handlers in signals.py.
+"""
+from collections import Counter
+
+from . import assignment, conditional, events, stats
+from .models import Task
+
+
+def tasks_created(tasks):
+    """Call inside the transaction that created ``tasks``."""
+    if not tasks:
+        return
+    conditional.bump_on_commit(Task)
+    for task in tasks:
+        events.publish_on_commit(events.task_event("created", task))
+    deltas, loads = Counter(), Counter()
+    for task in tasks:
+        deltas.update(stats.diff(None, stats.values(task)))
+        loads.update(assignment.diff(None, stats.values(task)))
+    stats.apply(deltas)
+    assignment.apply(loads)
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core import checks
+
+# Backends that don't share their contents between processes.
+LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def _local_cache():
+    return settings.CACHES.get("default", {}).get("BACKEND") in LOCAL_CACHES
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Replica pins (routers.py) only work if every process sees them."""
+    if not _local_cache() or not getattr(settings, "TASKS_REPLICA_DATABASES", []):
+        return []
+    return [
+        checks.Warning(
+            "TASKS_REPLICA_DATABASES is set but the default cache is not shared "
+            "between processes.",
+            hint=(
+                "A user who writes through one process would not be pinned to the "
+                "primary in the others. Point CACHES at a shared backend such as Redis."
+            ),
+            id="tasks.W001",
+        )
+    ]
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_deploy_cache(app_configs, **kwargs):
+    """List ETags (conditional.py) go stale unless every process shares the cache."""
+    if not _local_cache():
+        return []
+    return [
+        checks.Warning(
+            "The default cache is not shared between processes.",
+            hint=(
+                "Writes served by one worker would not invalidate the list ETags, "
+                "role caches or replica pins of the others. Set REDIS_URL."
+            ),
+            id="tasks.W002",
+        )
+    ]
@@ -0,0 +1,220 @@
+"""
+Response compression negotiated through ``Accept-Encoding``.
+
+Supports zstd (``zstandard``), br (``brotli``) and gzip (stdlib); codecs
+whose package is not installed are skipped. Among the encodings the
+client accepts, the highest q-value wins and ties go to the order of
+``TASKS_COMPRESSION["ENCODINGS"]``. Responses under ``MIN_SIZE`` bytes
+are sent as is. Streaming responses (exports) are compressed in blocks of
+``STREAM_BUFFER`` input bytes with a flush after each, so nothing is
+buffered whole; event streams are left alone.
+"""
+import zlib
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+DEFAULTS = {
+    "ENABLED": True,
+    "MIN_SIZE": 1024,
+    # Exports yield one row per chunk. Flushing each one costs a few bytes
+    # and restarts the codec's block, which makes output far larger than
+    # one-shot compression, so streamed input is batched up to this size.
+    "STREAM_BUFFER": 64 * 1024,
+    "ENCODINGS": ["zstd", "br", "gzip"],
+    "LEVELS": {"zstd": 3, "br": 4, "gzip": 6},
+}
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+)
+
+
+def compression_settings():
+    return {**DEFAULTS, **getattr(settings, "TASKS_COMPRESSION", {})}
+
+
+class GzipStream:
+    def __init__(self, level):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data):
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+class BrotliStream:
+    def __init__(self, level):
+        self._obj = brotli.Compressor(quality=level)
+
+    def chunk(self, data):
+        return self._obj.process(data) + self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class ZstdStream:
+    def __init__(self, level):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def chunk(self, data):
+        return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+STREAMS = {"gzip": GzipStream}
+if brotli is not None:
+    STREAMS["br"] = BrotliStream
+if zstandard is not None:
+    STREAMS["zstd"] = ZstdStream
+
+
+def compress(encoding, data, level):
+    stream = STREAMS[encoding](level)
+    return stream.chunk(data) + stream.finish()
+
+
+class BufferedStream:
+    """Feeds a stream in blocks of at least ``size`` bytes."""
+
+    def __init__(self, stream, size):
+        self.stream = stream
+        self.size = size
+        self.parts = []
+        self.pending = 0
+
+    def add(self, data):
+        """Compressed output once ``size`` bytes are pending, else ``b""``."""
+        self.parts.append(data)
+        self.pending += len(data)
+        if self.pending < self.size:
+            return b""
+        return self.stream.chunk(self._take())
+
+    def finish(self):
+        data = self._take()
+        return (self.stream.chunk(data) if data else b"") + self.stream.finish()
+
+    def _take(self):
+        data = b"".join(self.parts)
+        self.parts, self.pending = [], 0
+        return data
+
+
+def accepted_encodings(header):
+    """Parse ``Accept-Encoding`` into ``{coding: q}``."""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate(header, encodings):
+    """The best of ``encodings`` (in preference order) for ``header``, or None."""
+    accepted = accepted_encodings(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        config = compression_settings()
+        if not config["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.min_size = config["MIN_SIZE"]
+        self.buffer_size = config["STREAM_BUFFER"]
+        self.encodings = [e for e in config["ENCODINGS"] if e in STREAMS]
+        self.levels = {**DEFAULTS["LEVELS"], **config["LEVELS"]}
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.has_header("Content-Encoding"):
+            return response
+        content_type = response.get("Content-Type", "").lower()
+        if not content_type.startswith(COMPRESSIBLE_TYPES) or content_type.startswith(
+            "text/event-stream"
+        ):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""), self.encodings)
+        if encoding is None:
+            return response
+        level = self.levels.get(encoding)
+
+        if response.streaming:
+            stream = BufferedStream(STREAMS[encoding](level), self.buffer_size)
+            if response.is_async:
+                response.streaming_content = self._acompress(response.streaming_content, stream)
+            else:
+                response.streaming_content = self._compress(response.streaming_content, stream)
+            del response.headers["Content-Length"]
+        else:
+            compressed = compress(encoding, response.content, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # The representation changed, so a strong validator no longer holds.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    @staticmethod
+    def _compress(chunks, stream):
+        for chunk in chunks:
+            data = stream.add(chunk)
+            if data:
+                yield data
+        yield stream.finish()
+
+    @staticmethod
+    async def _acompress(chunks, stream):
+        async for chunk in chunks:
+            data = stream.add(chunk)
+            if data:
+                yield data
+        yield stream.finish()
@@ -0,0 +1,79 @@
+"""
+Cheap validators for conditional GETs on the task endpoints.
+
+Lists are stamped with a per-table change counter kept in the cache and
+bumped after every committed write; a single task uses its ``updated_at``.
+The counter must be visible to every process, so deployments set
+REDIS_URL to give settings.CACHES a shared backend (check --deploy warns
+otherwise). The keys don't expire; an evicted counter
+restarts from a new value, which only invalidates old ETags.
+"""
+import hashlib
+import time
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Task
+
+VERSION_KEY = "tasks:version:{}"
+
+
+def _key(model):
+    return VERSION_KEY.format(model._meta.label_lower)
+
+
+def table_version(model):
+    key = _key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(model):
+    try:
+        cache.incr(_key(model))
+    except ValueError:
+        # Evicted or never set: any fresh value invalidates old ETags.
+        cache.add(_key(model), time.time_ns(), None)
+
+
+def bump_on_commit(model):
+    transaction.on_commit(partial(bump_version, model))
+
+
+def task_list_etag(request, *args, **kwargs):
+    raw = "|".join([
+        str(table_version(Task)),
+        request.get_full_path(),
+        request.META.get("HTTP_ACCEPT", ""),
+    ])
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _task_updated_at(request, pk):
+    # etag_func and last_modified_func both need it; look it up once.
+    # New comments and log entries move last_activity_at, not updated_at.
+    if not hasattr(request, "_task_updated_at"):
+        row = Task.objects.filter(pk=pk).values_list("updated_at", "last_activity_at").first()
+        request._task_updated_at = max(row) if row else None
+    return request._task_updated_at
+
+
+def task_etag(request, pk, *args, **kwargs):
+    updated_at = _task_updated_at(request, pk)
+    if updated_at is None:
+        return None
+    etag = f"{pk}-{updated_at.timestamp():.6f}"
+    # ?fields= / ?expand= change the representation (see sparse.py).
+    query = request.META.get("QUERY_STRING")
+    if query:
+        etag += "-" + hashlib.md5(query.encode()).hexdigest()[:8]
+    return etag
+
+
+def task_last_modified(request, pk, *args, **kwargs):
+    return _task_updated_at(request, pk)
@@ -0,0 +1,133 @@
+"""
+In-process fan-out of task events to server-sent-event streams.
+
+Model signals publish events once the writing transaction commits; each
+open stream owns a bounded asyncio queue fed thread-safely from whichever
+thread did the write. A single process only sees its own writes, so run
+one ASGI worker per broker or swap ``broker`` for a shared implementation.
+"""
+import asyncio
+import json
+import threading
+from functools import partial
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from .roles import ADMIN, MANAGER
+
+QUEUE_SIZE = 1000
+
+
+class Subscription:
+    def __init__(self, broker, loop):
+        self.broker = broker
+        self.loop = loop
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: end its stream rather than buffer without bound.
+            self.broker.unsubscribe(self)
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    def deliver(self, event):
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def subscribe(self):
+        subscription = Subscription(self, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+
+broker = Broker()
+
+
+PAYLOAD_FIELDS = ("title", "status", "department_id", "created_by_id", "assigned_to_id", "updated_at")
+
+
+def task_payload(task):
+    return {
+        "id": task.pk,
+        "title": task.title,
+        "status": task.status,
+        "department": task.department_id,
+        "created_by": task.created_by_id,
+        "assigned_to": task.assigned_to_id,
+        "updated_at": task.updated_at,
+    }
+
+
+def task_event(kind, task):
+    # A task saved from .only() would otherwise load each field separately.
+    deferred = task.get_deferred_fields().intersection(PAYLOAD_FIELDS)
+    if deferred:
+        task.refresh_from_db(fields=deferred)
+    return {
+        "type": f"task.{kind}",
+        "task": task.pk,
+        # Who may see it; stripped before sending.
+        "audience": {task.created_by_id, task.assigned_to_id},
+        "data": task_payload(task),
+    }
+
+
+def comment_event(comment):
+    return {
+        "type": "comment.created",
+        "task": comment.task_id,
+        "audience": {comment.task.created_by_id, comment.task.assigned_to_id},
+        "data": {
+            "id": comment.pk,
+            "task": comment.task_id,
+            "user": comment.user_id,
+            "comment": comment.comment,
+            "created_at": comment.created_at,
+        },
+    }
+
+
+def publish_on_commit(event):
+    transaction.on_commit(partial(broker.publish, event))
+
+
+def visible_to(event, user_id, roles):
+    """Admins and managers see everything; others see their own tasks."""
+    return bool(roles & {ADMIN, MANAGER}) or user_id in event["audience"]
+
+
+def encode(event):
+    data = {key: value for key, value in event.items() if key != "audience"}
+    return (
+        f"event: {event['type']}\n"
+        f"data: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+    )
@@ -0,0 +1,81 @@
+"""
+Streaming exports. Rows are read with ``QuerySet.iterator()`` as plain
+tuples and encoded one at a time, so memory stays flat at any table size.
+Tables with an archive (see archive.py) are read from both tables and
+merged on id, so archived history is exported too.
+"""
+import csv
+import heapq
+from operator import itemgetter
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .archive import ARCHIVES
+from .models import ClientRequest, Task, TaskComment, TaskLog
+
+CHUNK_SIZE = 2000
+
+# export name -> (model, exported columns)
+EXPORTS = {
+    "tasks": (Task, [
+        "id", "title", "description", "department_id", "created_by_id",
+        "assigned_to_id", "status", "created_at", "updated_at",
+    ]),
+    "client-requests": (ClientRequest, [
+        "id", "client_id", "category", "description", "submitted_at",
+    ]),
+    "task-logs": (TaskLog, [
+        "id", "task_id", "user_id", "action_type", "old_value", "new_value",
+        "created_at",
+    ]),
+    "task-comments": (TaskComment, [
+        "id", "task_id", "user_id", "comment", "created_at",
+    ]),
+}
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def rows(name, chunk_size=CHUNK_SIZE):
+    model, fields = EXPORTS[name]
+    tables = [model, ARCHIVES[model]] if model in ARCHIVES else [model]
+    streams = [
+        table.objects.order_by("pk").values_list(*fields).iterator(chunk_size=chunk_size)
+        for table in tables
+    ]
+    if len(streams) == 1:
+        return streams[0]
+    # Archived rows keep their ids, so the two tables never share one.
+    return heapq.merge(*streams, key=itemgetter(fields.index("id")))
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_lines(name, chunk_size=CHUNK_SIZE):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORTS[name][1])
+    for row in rows(name, chunk_size):
+        yield writer.writerow(row)
+
+
+def ndjson_lines(name, chunk_size=CHUNK_SIZE):
+    fields = EXPORTS[name][1]
+    encoder = DjangoJSONEncoder()
+    for row in rows(name, chunk_size):
+        yield encoder.encode(dict(zip(fields, row))) + "\n"
+
+
+FORMATS = {
+    "csv": csv_lines,
+    "ndjson": ndjson_lines,
+}
+
+
+def lines(name, fmt, chunk_size=CHUNK_SIZE):
+    return FORMATS[fmt](name, chunk_size)
@@ -0,0 +1,151 @@
+"""
+Read-only fast path for list endpoints.
+
+``FastSerializer`` compiles a DRF serializer class once into a flat plan of
+``.values()`` columns and converters, then builds the same output dicts
+straight from the rows, skipping per-field ``ModelSerializer`` machinery
+and model instantiation. Fields whose ``to_representation`` is a no-op for
+database values are passed through; anything else reuses the field's own
+``to_representation`` so the rendered JSON is byte-identical.
+"""
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .instrumentation import span
+from .pagination import cursor_columns
+
+# Field types whose representation of a database value is the value itself.
+PASSTHROUGH_FIELDS = (
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.ReadOnlyField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+CONVERTED_FIELDS = (
+    serializers.DateTimeField,
+    serializers.DateField,
+    serializers.DecimalField,
+    serializers.FloatField,
+)
+
+
+def _column(prefix, field):
+    return prefix + field.source.replace(".", "__")
+
+
+def _compile(serializer, prefix=""):
+    plan = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.BaseSerializer):
+            nested_prefix = _column(prefix, field) + "__"
+            pk = field.Meta.model._meta.pk.name
+            plan.append((name, nested_prefix + pk, None, _compile(field, nested_prefix)))
+        elif isinstance(field, PASSTHROUGH_FIELDS):
+            plan.append((name, _column(prefix, field), None, None))
+        elif isinstance(field, CONVERTED_FIELDS):
+            plan.append((name, _column(prefix, field), field, None))
+        else:
+            raise TypeError(
+                f"{type(serializer).__name__}.{name}: "
+                f"{type(field).__name__} has no fast representation"
+            )
+    return plan
+
+
+def _columns(plan):
+    for _, column, _, nested in plan:
+        yield column
+        if nested is not None:
+            yield from _columns(nested)
+
+
+def _datetime_converter(field):
+    """
+    ``DateTimeField.to_representation`` for aware ISO 8601 output without
+    the per-value format and timezone lookups.
+    """
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    tz = getattr(field, "timezone", None) or field.default_timezone()
+    if tz is None or output_format is None or output_format.lower() != ISO_8601:
+        return field.to_representation
+    slow = field.to_representation
+
+    def convert(value):
+        if value.tzinfo is None:
+            return slow(value)
+        try:
+            text = value.astimezone(tz).isoformat()
+        except OverflowError:
+            return slow(value)
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+    return convert
+
+
+def _bind(plan):
+    """Resolve converters; done per call since the timezone can be per request."""
+    bound = []
+    for key, column, field, nested in plan:
+        if nested is not None:
+            bound.append((key, column, None, _bind(nested)))
+        elif field is None:
+            bound.append((key, column, None, None))
+        elif isinstance(field, serializers.DateTimeField):
+            bound.append((key, column, _datetime_converter(field), None))
+        else:
+            bound.append((key, column, field.to_representation, None))
+    return bound
+
+
+def _build(plan, row):
+    data = {}
+    for key, column, convert, nested in plan:
+        value = row[column]
+        if nested is not None:
+            data[key] = None if value is None else _build(nested, row)
+        elif convert is None or value is None:
+            data[key] = value
+        else:
+            data[key] = convert(value)
+    return data
+
+
+class FastSerializer:
+    def __init__(self, serializer_class, **kwargs):
+        self.serializer_class = serializer_class
+        self.plan = _compile(serializer_class(**kwargs))
+        self.columns = list(dict.fromkeys(_columns(self.plan)))
+
+    def values(self, queryset, *extra):
+        """``extra`` columns are selected but not rendered, e.g. cursor keys."""
+        return queryset.values(*dict.fromkeys([*self.columns, *extra]))
+
+    def serialize(self, rows):
+        plan = _bind(self.plan)
+        with span("serialize"):
+            return [_build(plan, row) for row in rows]
+
+
+class FastListMixin:
+    """
+    Serve GET list requests through ``fast_serializer`` (a FastSerializer of
+    the view's ``serializer_class``); writes keep the regular serializer.
+    """
+    fast_serializer = None
+
+    def get_fast_serializer(self):
+        return self.fast_serializer
+
+    def list(self, request, *args, **kwargs):
+        fast = self.get_fast_serializer()
+        rows = fast.values(self.filter_queryset(self.get_queryset()), *cursor_columns(self))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(fast.serialize(page))
+        return Response(fast.serialize(rows))
@@ -0,0 +1,161 @@
+"""
+Opt-in per-request timing: query count, SQL time and time spent in DRF
+authentication, permission checks and serialization.
+
+Enable with ``TASKS_REQUEST_TIMING["ENABLED"]``. Results go out as a
+``Server-Timing`` header and, above ``SLOW_REQUEST_MS``, as a structured
+warning on the ``tasks.requests`` logger. When disabled the middleware
+removes itself at startup and the view hooks reduce to a context-variable
+lookup.
+"""
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("tasks.requests")
+
+DEFAULTS = {
+    "ENABLED": False,
+    "SAMPLE_RATE": 1.0,
+    "SLOW_REQUEST_MS": 500,
+    "SERVER_TIMING_HEADER": True,
+}
+
+_current = ContextVar("tasks_request_timings", default=None)
+
+
+def timing_settings():
+    return {**DEFAULTS, **getattr(settings, "TASKS_REQUEST_TIMING", {})}
+
+
+class Timings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.spans = {"db": 0.0, "auth": 0.0, "perm": 0.0, "serialize": 0.0}
+
+    def add(self, name, seconds):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.add("db", time.perf_counter() - start)
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total):
+        parts = [
+            f"{name};dur={seconds * 1000:.2f}"
+            + (f';desc="{self.queries} queries"' if name == "db" else "")
+            for name, seconds in self.spans.items()
+        ]
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def span(name):
+    """Time a block against the current request, if it is being timed."""
+    timings = _current.get()
+    if timings is None:
+        yield
+    else:
+        with timings.span(name):
+            yield
+
+
+class RequestTimingMiddleware:
+    def __init__(self, get_response):
+        config = timing_settings()
+        if not config["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = config["SAMPLE_RATE"]
+        self.slow_seconds = config["SLOW_REQUEST_MS"] / 1000
+        self.header = config["SERVER_TIMING_HEADER"]
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        timings = Timings()
+        token = _current.set(timings)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings.execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        total = timings.total()
+        if self.header:
+            response["Server-Timing"] = timings.server_timing(total)
+        if total >= self.slow_seconds:
+            self.log_slow(request, response, timings, total)
+        return response
+
+    def log_slow(self, request, response, timings, total):
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "user": getattr(getattr(request, "user", None), "pk", None),
+            "queries": timings.queries,
+            "total_ms": round(total * 1000, 2),
+            **{f"{name}_ms": round(s * 1000, 2) for name, s in timings.spans.items()},
+        }
+        logger.warning("slow request %s", json.dumps(record), extra={"timing": record})
+
+
+class InstrumentedViewMixin:
+    """DRF view hooks feeding the current request's timings."""
+
+    def perform_authentication(self, request):
+        with span("auth"):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with span("perm"):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with span("perm"):
+            super().check_object_permissions(request, obj)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        timings = _current.get()
+        if timings is not None:
+            to_representation = serializer.to_representation
+
+            def timed(instance):
+                with timings.span("serialize"):
+                    return to_representation(instance)
+
+            serializer.to_representation = timed
+        return serializer
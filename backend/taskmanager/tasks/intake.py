@@ -0,0 +1,88 @@
+"""
+Turn incoming ClientRequests into Tasks through the job queue.
+
+Each new request enqueues a ``convert_client_request`` job (signals.py);
+``manage.py run_worker`` converts them in batches. The task goes to the
+Department named like the client's department, or to
+``TASKS_INTAKE["DEFAULT_DEPARTMENT"]``, and is created by the
+``TASKS_INTAKE["USERNAME"]`` account. ``Task.client_request`` is unique,
+so a retried job never creates a second task.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+
+from . import assignment, bulk, jobs
+from .models import ClientRequest, Department, Job, Task
+
+KIND = "convert_client_request"
+
+DEFAULTS = {
+    "USERNAME": "intake",
+    "DEFAULT_DEPARTMENT": "Intake",
+}
+
+
+def config():
+    return {**DEFAULTS, **getattr(settings, "TASKS_INTAKE", {})}
+
+
+def enqueue_on_commit(request):
+    jobs.enqueue_on_commit(KIND, {"client_request_id": request.pk})
+
+
+def enqueue_backlog():
+    """Queue every unconverted request that has no pending job; return how many."""
+    pending = set(
+        Job.objects.filter(kind=KIND, status="PENDING")
+        .values_list("payload__client_request_id", flat=True)
+    )
+    ids = ClientRequest.objects.filter(task__isnull=True).values_list("id", flat=True)
+    return len(jobs.enqueue(KIND, ({"client_request_id": pk} for pk in ids if pk not in pending)))
+
+
+def title(request):
+    summary = request.description.strip().splitlines()[0] if request.description.strip() else ""
+    return f"[{request.get_category_display()}] {request.client.name}: {summary}"[:255]
+
+
+def _intake_user():
+    user, created = User.objects.get_or_create(username=config()["USERNAME"])
+    if created:
+        user.set_unusable_password()
+        user.save(update_fields=["password"])
+    return user
+
+
+@jobs.handler(KIND)
+def convert(batch):
+    requests = list(
+        ClientRequest.objects.filter(
+            id__in=[job.payload["client_request_id"] for job in batch],
+            task__isnull=True,
+        ).select_related("client")
+    )
+    if not requests:
+        return
+
+    departments = dict(
+        Department.objects.filter(name__in={r.client.department for r in requests})
+        .values_list("name", "id")
+    )
+    fallback = None
+    if any(r.client.department not in departments for r in requests):
+        fallback = Department.objects.get_or_create(name=config()["DEFAULT_DEPARTMENT"])[0].pk
+
+    user = _intake_user()
+    tasks = [
+        Task(
+            title=title(request),
+            description=request.description,
+            department_id=departments.get(request.client.department, fallback),
+            created_by=user,
+            client_request=request,
+        )
+        for request in requests
+    ]
+    if assignment.config()["AUTO_ASSIGN"]:
+        assignment.assign(tasks)
+    bulk.tasks_created(Task.objects.bulk_create(tasks))
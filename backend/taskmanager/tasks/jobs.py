@@ -0,0 +1,150 @@
+"""
+A durable job queue in the Job table.
+
+Workers claim a batch by stamping ``locked_by``/``locked_until`` on it.
+On backends with ``SELECT ... FOR UPDATE SKIP LOCKED`` (PostgreSQL)
+concurrent workers skip each other's rows while claiming; elsewhere
+(SQLite) the claim is a single ``UPDATE ... WHERE id IN (SELECT ...
+LIMIT n)``, which the database's write lock serializes. A batch runs in
+one transaction; if it fails, its jobs are retried one by one so a bad
+job cannot hold back the others. Failures back off exponentially and
+give up after ``MAX_ATTEMPTS``.
+
+Handlers take a list of jobs of one kind and are registered with
+``@handler("kind")``.
+"""
+import logging
+import os
+import socket
+import traceback
+import uuid
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger("tasks.jobs")
+
+DEFAULTS = {
+    "BATCH_SIZE": 100,
+    "MAX_ATTEMPTS": 5,
+    "RETRY_DELAY_SECONDS": 30,
+    "LEASE_SECONDS": 300,
+    "POLL_INTERVAL_SECONDS": 1.0,
+}
+
+HANDLERS = {}
+
+
+def config():
+    return {**DEFAULTS, **getattr(settings, "TASKS_JOBS", {})}
+
+
+def handler(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, payloads):
+    return Job.objects.bulk_create(Job(kind=kind, payload=p) for p in payloads)
+
+
+def enqueue_on_commit(kind, payload):
+    transaction.on_commit(partial(enqueue, kind, [payload]))
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"[-64:]
+
+
+def claim(worker, kinds, limit, lease_seconds=None):
+    """Lock up to ``limit`` runnable jobs for ``worker`` and return them."""
+    now = timezone.now()
+    lease = lease_seconds if lease_seconds is not None else config()["LEASE_SECONDS"]
+    claimable = Job.objects.filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+        status="PENDING",
+        kind__in=kinds,
+        run_after__lte=now,
+    ).order_by("run_after", "id")
+    stamp = {"locked_by": worker, "locked_until": now + timedelta(seconds=lease)}
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(
+                claimable.select_for_update(skip_locked=True).values_list("id", flat=True)[:limit]
+            )
+            Job.objects.filter(id__in=ids).update(**stamp)
+    else:
+        Job.objects.filter(id__in=claimable.values("id")[:limit]).update(**stamp)
+
+    return list(Job.objects.filter(status="PENDING", **stamp).order_by("id"))
+
+
+def _complete(jobs):
+    Job.objects.filter(id__in=[job.id for job in jobs]).update(
+        status="DONE", attempts=F("attempts") + 1,
+        locked_by="", locked_until=None, last_error="", updated_at=timezone.now(),
+    )
+
+
+def _fail(job, error):
+    options = config()
+    job.attempts += 1
+    job.status = "FAILED" if job.attempts >= options["MAX_ATTEMPTS"] else "PENDING"
+    job.run_after = timezone.now() + timedelta(
+        seconds=options["RETRY_DELAY_SECONDS"] * 2 ** (job.attempts - 1)
+    )
+    job.locked_by, job.locked_until = "", None
+    job.last_error = error[-4000:]
+    job.save(update_fields=[
+        "attempts", "status", "run_after", "locked_by", "locked_until", "last_error", "updated_at",
+    ])
+    logger.warning("job %s failed (attempt %s): %s", job.pk, job.attempts, error.splitlines()[-1])
+
+
+def run(jobs):
+    """Run claimed jobs of one kind; return ``(done, failed)`` counts."""
+    try:
+        with transaction.atomic():
+            # Write first: on SQLite this takes the database write lock
+            # before the handler reads, so concurrent workers wait for it
+            # instead of failing to upgrade a read lock.
+            _complete(jobs)
+            HANDLERS[jobs[0].kind](jobs)
+        return len(jobs), 0
+    except Exception:
+        if len(jobs) == 1:
+            _fail(jobs[0], traceback.format_exc())
+            return 0, 1
+    done = failed = 0
+    for job in jobs:
+        d, f = run([job])
+        done, failed = done + d, failed + f
+    return done, failed
+
+
+def work(worker, kinds=None, batch_size=None, max_jobs=None):
+    """Claim and run batches until none are runnable; return ``(done, failed)``."""
+    kinds = list(kinds or HANDLERS)
+    batch_size = batch_size or config()["BATCH_SIZE"]
+    done = failed = 0
+    while max_jobs is None or done + failed < max_jobs:
+        limit = batch_size if max_jobs is None else min(batch_size, max_jobs - done - failed)
+        jobs = claim(worker, kinds, limit)
+        if not jobs:
+            break
+        by_kind = {}
+        for job in jobs:
+            by_kind.setdefault(job.kind, []).append(job)
+        for batch in by_kind.values():
+            d, f = run(batch)
+            done, failed = done + d, failed + f
+    return done, failed
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from tasks import archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move task comments and log entries older than TASKS_ARCHIVE['AFTER_DAYS'] "
+        "into the archive tables. Safe to run from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--after-days", type=int, help="Override TASKS_ARCHIVE['AFTER_DAYS'].")
+        parser.add_argument("--batch-size", type=int, help="Override TASKS_ARCHIVE['BATCH_SIZE'].")
+        parser.add_argument(
+            "--if-due",
+            action="store_true",
+            help="Skip the run if another process archived within INTERVAL_SECONDS.",
+        )
+
+    def handle(self, *args, **options):
+        if options["if_due"]:
+            moved = archive.run_if_due()
+            if moved is None:
+                self.stdout.write("Not due yet.")
+                return
+        else:
+            moved = archive.run(options["after_days"], options["batch_size"])
+        for name, count in moved.items():
+            self.stdout.write(f"{name}: archived {count} rows.")
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent-request throughput of the sync task endpoints "
+        "(threaded, WSGI-style handler) with their async/ variants (ASGI "
+        "handler on one event loop). Runs in-process against the configured "
+        "database, so load realistic data first. The numbers compare the "
+        "two handler paths through Django's test clients, not servers: "
+        "there is no HTTP, no worker model and the GIL is shared. For "
+        "deployment figures, load the sync routes under gunicorn and the "
+        "async ones under uvicorn with an external HTTP load generator."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", required=True, help="User to authenticate as.")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--task-id", type=int, help="Task used for detail/comments/logs.")
+
+    def handle(self, *args, username, requests, concurrency, task_id, **options):
+        try:
+            user = User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {username!r}.")
+
+        paths = ["tasks/"]
+        if task_id:
+            paths += [f"tasks/{task_id}/", f"tasks/{task_id}/comments/", f"tasks/{task_id}/logs/"]
+
+        # The in-process test clients send "Host: testserver".
+        self.stdout.write("In-process test clients only; not server throughput.")
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            results = self.compare(user, paths, requests, concurrency)
+        self.stdout.write(json.dumps({"mode": "in-process", "results": results}, indent=2))
+
+    def compare(self, user, paths, requests, concurrency):
+        results = []
+        for path in paths:
+            sync = self.run_sync(user, f"/api/{path}", requests, concurrency)
+            async_ = asyncio.run(
+                self.run_async(user, f"/api/async/{path}", requests, concurrency)
+            )
+            results.append({"path": path, "sync": sync, "async": async_})
+            self.stdout.write(
+                f"{path:<28} sync {sync['rps']:>8.1f} req/s   "
+                f"async {async_['rps']:>8.1f} req/s"
+            )
+        return results
+
+    def _summary(self, statuses, elapsed):
+        return {
+            "requests": len(statuses),
+            "errors": sum(1 for status in statuses if status >= 400),
+            "seconds": round(elapsed, 4),
+            "rps": len(statuses) / elapsed if elapsed else 0.0,
+        }
+
+    def run_sync(self, user, url, requests, concurrency):
+        def worker(count):
+            client = Client()
+            client.force_login(user)
+            return [client.get(url).status_code for _ in range(count)]
+
+        shares = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            statuses = [s for batch in pool.map(worker, shares) for s in batch]
+        return self._summary(statuses, time.perf_counter() - start)
+
+    async def run_async(self, user, url, requests, concurrency):
+        client = AsyncClient()
+        await client.aforce_login(user)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                return (await client.get(url)).status_code
+
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(one() for _ in range(requests)))
+        return self._summary(statuses, time.perf_counter() - start)
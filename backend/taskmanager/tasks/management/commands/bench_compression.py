@@ -0,0 +1,96 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from tasks import compression, export, renderers
+from tasks.serializers import TaskSerializer
+
+from .generate_load_data import unsaved_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure bytes on the wire and CPU per response for JSON rendering "
+        "(DRF vs orjson) and each available compression codec, on a list "
+        "page and an export-sized payload. Exports go through "
+        "CompressionMiddleware one NDJSON row per chunk, as ExportView "
+        "streams them, and are compared with one-shot compression."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-rows", type=int, default=50)
+        parser.add_argument("--export-rows", type=int, default=20000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        levels = {**compression.DEFAULTS["LEVELS"], **compression.compression_settings()["LEVELS"]}
+        results = []
+        for label, rows in (("page", options["page_rows"]), ("export", options["export_rows"])):
+            data = TaskSerializer(unsaved_tasks(rows), many=True).data
+            repeat = options["repeat"] if label == "page" else max(1, options["repeat"] // 10)
+
+            body, drf_cpu = self.cpu(repeat, lambda: JSONRenderer().render(data))
+            results.append(self.row(label, "json (DRF)", len(body), drf_cpu))
+            if renderers.orjson is not None:
+                fast_body, fast_cpu = self.cpu(repeat, lambda: renderers.FastJSONRenderer().render(data))
+                if fast_body != body:
+                    raise CommandError("orjson output differs from JSONRenderer")
+                results.append(self.row(label, "json (orjson)", len(fast_body), fast_cpu))
+
+            if label == "export":
+                lines = self.ndjson(rows)
+                body = b"".join(lines)
+            for encoding in compression.STREAMS:
+                level = levels[encoding]
+                out, cpu = self.cpu(repeat, lambda: compression.compress(encoding, body, level))
+                results.append(self.row(label, encoding, len(out), cpu, len(body)))
+                if label == "export":
+                    out, cpu = self.cpu(repeat, lambda: self.stream(encoding, lines))
+                    results.append(self.row(label, f"{encoding} (streamed)", len(out), cpu, len(body)))
+
+        for r in results:
+            self.stdout.write(
+                f"{r['payload']:<7} {r['format']:<18} {r['bytes']:>10} B "
+                f"{r['ratio']:>6.2f}x  {r['cpu_ms']:>9.3f} ms CPU"
+            )
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def ndjson(self, rows):
+        """Encoded export lines, built the way export.ndjson_lines does."""
+        fields = export.EXPORTS["tasks"][1]
+        encoder = DjangoJSONEncoder()
+        return [
+            (encoder.encode({name: getattr(task, name) for name in fields}) + "\n").encode()
+            for task in unsaved_tasks(rows)
+        ]
+
+    def stream(self, encoding, lines):
+        """The bytes CompressionMiddleware sends for a streamed export."""
+        request = RequestFactory().get("/api/export/tasks.ndjson", HTTP_ACCEPT_ENCODING=encoding)
+        response = StreamingHttpResponse(iter(lines), content_type=export.CONTENT_TYPES["ndjson"])
+        response = compression.CompressionMiddleware(lambda request: response)(request)
+        if response.get("Content-Encoding") != encoding:
+            raise CommandError(f"CompressionMiddleware did not apply {encoding}")
+        return b"".join(response.streaming_content)
+
+    def cpu(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            start = time.process_time()
+            output = func()
+            timings.append(time.process_time() - start)
+        return output, min(timings) * 1000
+
+    def row(self, payload, fmt, size, cpu_ms, raw=None):
+        return {
+            "payload": payload,
+            "format": fmt,
+            "bytes": size,
+            "ratio": round((raw or size) / size, 2),
+            "cpu_ms": round(cpu_ms, 3),
+        }
@@ -0,0 +1,85 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from tasks import intake, jobs
+from tasks.models import Client, ClientRequest, Job, Task
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure job queue throughput: queue N client requests, drain them "
+        "with several run_worker processes and check every request became "
+        "exactly one task. Needs a database other processes can open "
+        "(not an in-memory SQLite database). Removes its rows afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=5000)
+        parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+        parser.add_argument("--concurrency", type=int, default=1, help="Threads per process.")
+        parser.add_argument("--batch-size", type=int, default=100)
+
+    def handle(self, *args, **options):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            raise CommandError("The benchmark needs a file or server database.")
+
+        results = []
+        for processes in options["processes"]:
+            client = Client.objects.create(name="Queue benchmark", department="Benchmark")
+            try:
+                results.append(self.run_once(client, processes, options))
+            finally:
+                Task.objects.filter(client_request__client=client).delete()
+                client.delete()
+            r = results[-1]
+            self.stdout.write(
+                f"{r['processes']} processes x {r['concurrency']} threads: "
+                f"{r['jobs']} jobs in {r['seconds']:.2f}s = {r['jobs_per_second']:.0f} jobs/s"
+            )
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def run_once(self, client, processes, options):
+        requests = ClientRequest.objects.bulk_create(
+            ClientRequest(client=client, category="OTHER", description=f"Benchmark request {i}")
+            for i in range(options["requests"])
+        )
+        queued = jobs.enqueue(intake.KIND, ({"client_request_id": r.pk} for r in requests))
+        command = [
+            sys.executable, "-m", "django", "run_worker", "--once",
+            "--kinds", intake.KIND,
+            "--batch-size", str(options["batch_size"]),
+            "--concurrency", str(options["concurrency"]),
+        ]
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+
+        start = time.perf_counter()
+        workers = [
+            subprocess.Popen(command, cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL)
+            for _ in range(processes)
+        ]
+        if any(worker.wait() for worker in workers):
+            raise CommandError("A worker process failed.")
+        seconds = time.perf_counter() - start
+
+        converted = Task.objects.filter(client_request__client=client).count()
+        job_ids = [job.pk for job in queued]
+        done = Job.objects.filter(pk__in=job_ids, status="DONE").count()
+        Job.objects.filter(pk__in=job_ids).delete()
+        if converted != len(requests) or done != len(requests):
+            raise CommandError(
+                f"Expected {len(requests)} tasks and done jobs, got {converted} and {done}."
+            )
+        return {
+            "processes": processes,
+            "concurrency": options["concurrency"],
+            "jobs": len(requests),
+            "seconds": round(seconds, 3),
+            "jobs_per_second": round(len(requests) / seconds, 1),
+        }
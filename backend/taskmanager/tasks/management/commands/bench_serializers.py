@@ -0,0 +1,95 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from tasks.fast_serializers import FastSerializer
+from tasks.models import TaskComment, TaskLog
+from tasks.serializers import TaskCommentSerializer, TaskLogSerializer, TaskSerializer
+
+from .generate_load_data import unsaved_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Time ModelSerializer against FastSerializer on in-memory rows "
+        "(serialization and rendering only, no database) and check that "
+        "both render identical JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, rows, repeat, **options):
+        now = timezone.now()
+        tasks = unsaved_tasks(rows)
+        comments = [
+            TaskComment(
+                id=task.id, task_id=task.id, user=task.created_by,
+                comment="looks good", created_at=now,
+            )
+            for task in tasks
+        ]
+        logs = [
+            TaskLog(
+                id=task.id, task_id=task.id, user=task.created_by if task.id % 5 else None,
+                action_type="STATUS_CHANGE", old_value="OPEN", new_value="DONE",
+                created_at=now,
+            )
+            for task in tasks
+        ]
+
+        results = []
+        for serializer_class, objects in (
+            (TaskSerializer, tasks),
+            (TaskCommentSerializer, comments),
+            (TaskLogSerializer, logs),
+        ):
+            fast = FastSerializer(serializer_class)
+            values = [self.as_values(obj, fast.columns) for obj in objects]
+
+            slow_json, slow_time = self.best(
+                repeat, lambda: JSONRenderer().render(serializer_class(objects, many=True).data)
+            )
+            fast_json, fast_time = self.best(
+                repeat, lambda: JSONRenderer().render(fast.serialize(values))
+            )
+            if slow_json != fast_json:
+                raise CommandError(f"{serializer_class.__name__}: output differs")
+
+            results.append({
+                "serializer": serializer_class.__name__,
+                "rows": rows,
+                "model_serializer_seconds": round(slow_time, 4),
+                "fast_serializer_seconds": round(fast_time, 4),
+                "speedup": round(slow_time / fast_time, 2),
+            })
+            self.stdout.write(
+                f"{serializer_class.__name__:<24} {slow_time:8.3f}s -> "
+                f"{fast_time:8.3f}s  ({slow_time / fast_time:.1f}x)"
+            )
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def best(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = func()
+            timings.append(time.perf_counter() - start)
+        return output, min(timings)
+
+    def as_values(self, obj, columns):
+        """What ``.values(*columns)`` would return for ``obj``."""
+        row = {}
+        for column in columns:
+            *path, last = column.split("__")
+            value = obj
+            for part in path:
+                value = getattr(value, part) if value is not None else None
+            if value is not None:
+                value = getattr(value, value._meta.get_field(last).attname)
+            row[column] = value
+        return row
@@ -0,0 +1,132 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter per sample. Cold start covers importing and
+# setting up Django and loading the URLconf, i.e. everything a worker does
+# before its first request. The request loop then times the same
+# unauthenticated request through the profile's middleware and through an
+# empty stack.
+PROBE = """
+import json, statistics, sys, time
+
+start = time.perf_counter()
+baseline = len(sys.modules)
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+
+handler = get_wsgi_application()
+get_resolver().url_patterns
+cold_start = time.perf_counter() - start
+modules = len(sys.modules) - baseline
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import RequestFactory, override_settings
+
+path, count = sys.argv[1], int(sys.argv[2])
+
+def per_request(handler):
+    environs = [RequestFactory().get(path, HTTP_HOST="localhost").environ for _ in range(count)]
+    samples = []
+    for environ in environs:
+        t = time.perf_counter()
+        response = handler(environ, lambda status, headers: None)
+        b"".join(response)
+        response.close()
+        samples.append(time.perf_counter() - t)
+    return statistics.median(samples), status_of(handler, environs[0])
+
+def status_of(handler, environ):
+    status = []
+    response = handler(dict(environ), lambda s, h: status.append(s))
+    response.close()
+    return status[0]
+
+with override_settings(MIDDLEWARE=[]):
+    bare = WSGIHandler()
+request, status = per_request(handler)
+bare_request, _ = per_request(bare)
+print(json.dumps({
+    "cold_start": cold_start,
+    "modules": modules,
+    "request": request,
+    "bare_request": bare_request,
+    "status": status,
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure worker cold start (imports, django.setup() and URLconf) and "
+        "per-request middleware overhead for the full and the API-only "
+        "settings profiles. Every sample starts a fresh interpreter."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profiles", nargs="+",
+            default=["taskmanager.settings", "taskmanager.settings_api"],
+            help="Settings modules to compare.",
+        )
+        parser.add_argument("--runs", type=int, default=5, help="Processes per profile.")
+        parser.add_argument("--requests", type=int, default=1000, help="Requests per process.")
+        parser.add_argument("--path", default="/api/tasks/")
+        parser.add_argument(
+            "--top", type=int, default=8,
+            help="Show the packages with the most import time (0 to skip).",
+        )
+
+    def handle(self, *args, **options):
+        results = []
+        for profile in options["profiles"]:
+            samples = [self.sample(profile, options) for _ in range(options["runs"])]
+            median = lambda key: statistics.median(s[key] for s in samples)  # noqa: E731
+            r = {
+                "profile": profile,
+                "cold_start_ms": round(median("cold_start") * 1000, 1),
+                "modules": samples[0]["modules"],
+                "request_us": round(median("request") * 1e6, 1),
+                "middleware_us": round((median("request") - median("bare_request")) * 1e6, 1),
+                "status": samples[0]["status"],
+            }
+            results.append(r)
+            self.stdout.write(
+                f"{profile:<28} cold start {r['cold_start_ms']:>7.1f} ms  "
+                f"{r['modules']:>5} modules  request {r['request_us']:>7.1f} us  "
+                f"middleware {r['middleware_us']:>7.1f} us  ({r['status']})"
+            )
+            if options["top"]:
+                for package, micros in self.import_times(profile, options):
+                    self.stdout.write(f"    {package:<32} {micros / 1000:>7.1f} ms")
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def run_probe(self, profile, options, *flags):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": profile}
+        proc = subprocess.run(
+            [sys.executable, *flags, "-c", PROBE, options["path"], str(options["requests"])],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode:
+            raise CommandError(f"{profile} failed to start:\n{proc.stderr}")
+        return proc
+
+    def sample(self, profile, options):
+        return json.loads(self.run_probe(profile, options).stdout)
+
+    def import_times(self, profile, options):
+        """Self import time per top-level package, from ``python -X importtime``."""
+        totals = Counter()
+        for line in self.run_probe(profile, {**options, "requests": 1}, "-X", "importtime").stderr.splitlines():
+            if not line.startswith("import time:"):
+                continue
+            own, _, name = line[len("import time:"):].split("|")
+            if own.strip().isdigit():
+                totals[name.strip().split(".")[0]] += int(own)
+        return totals.most_common(options["top"])
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from tasks import export
+
+
+class Command(BaseCommand):
+    help = "Stream a full table export as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", choices=sorted(export.EXPORTS))
+        parser.add_argument(
+            "--format", dest="fmt", choices=sorted(export.FORMATS), default="csv"
+        )
+        parser.add_argument(
+            "--output", "-o", help="File to write to (default: stdout)."
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=export.CHUNK_SIZE,
+            help="Rows fetched per database round trip.",
+        )
+
+    def handle(self, *args, name, fmt, output, chunk_size, **options):
+        lines = export.lines(name, fmt, chunk_size)
+        if output is None:
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+
+        with open(output, "w", newline="", encoding="utf-8") as fh:
+            fh.writelines(lines)
@@ -0,0 +1,213 @@
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tasks.models import Client, ClientRequest, Department, Task, TaskComment, TaskLog
+
+PASSWORD = "loadtest"
+START = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+WORDS = (
+    "printer network outage laptop vpn password reset email server backup "
+    "monitor keyboard license install update crash slow login account access "
+    "wifi firewall database report invoice phone meeting room projector"
+).split()
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create keep the generated created_at/updated_at values."""
+    fields = [
+        field for model in models for field in model._meta.fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def unsaved_tasks(rows):
+    """
+    ``rows`` tasks built in memory for the bench_* commands, with their
+    creator and department attached. Nothing touches the database.
+    """
+    user = User(id=1, username="bench", email="bench@example.com")
+    department = Department(id=1, name="IT")
+    return [
+        Task(
+            id=i, title=" ".join(WORDS[(i + k) % len(WORDS)] for k in range(4)),
+            description=" ".join(WORDS[(i * k) % len(WORDS)] for k in range(30)),
+            status=("OPEN", "IN_PROGRESS", "DONE")[i % 3], department=department,
+            created_by=user, assigned_to_id=(i % 7) or None,
+            created_at=START - timedelta(seconds=i), updated_at=START,
+        )
+        for i in range(1, rows + 1)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic dataset for load tests. Users are "
+        f"named lt-admin-N, lt-manager-N and lt-user-N with password {PASSWORD!r}."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--departments", type=int, default=20)
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument("--tasks", type=int, default=100_000)
+        parser.add_argument("--logs-per-task", type=int, default=10, help="Average.")
+        parser.add_argument("--comments-per-task", type=int, default=5, help="Average.")
+        parser.add_argument("--clients", type=int, default=200)
+        parser.add_argument("--requests-per-client", type=int, default=5, help="Average.")
+        parser.add_argument("--days", type=int, default=365, help="Time span of created_at.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.span = timedelta(days=options["days"]).total_seconds()
+
+        with transaction.atomic():
+            departments = Department.objects.bulk_create(
+                Department(name=f"Department {i}") for i in range(options["departments"])
+            )
+            users = self.create_users(options["users"])
+            clients = self.create_clients(options["clients"], options["requests_per_client"])
+        self.stdout.write(
+            f"{len(departments)} departments, {len(users)} users, {len(clients)} clients"
+        )
+
+        department_ids = [d.pk for d in departments]
+        user_ids = [u.pk for u in users]
+        with explicit_timestamps(Task, TaskComment, TaskLog):
+            created = 0
+            while created < options["tasks"]:
+                size = min(self.batch_size, options["tasks"] - created)
+                with transaction.atomic():
+                    tasks = self.create_tasks(size, department_ids, user_ids)
+                    self.create_history(tasks, user_ids, options)
+                created += size
+                self.stdout.write(f"{created} tasks", ending="\r")
+        self.stdout.write("")
+
+        call_command("rebuild_task_stats", stdout=self.stdout)
+        call_command("repair_task_activity", stdout=self.stdout)
+        call_command("rebuild_assignee_load", stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    def create_users(self, count):
+        admin, _ = Group.objects.get_or_create(name="Admin")
+        manager, _ = Group.objects.get_or_create(name="Manager")
+        password = make_password(PASSWORD)
+
+        n_admins = max(1, count // 50)
+        n_managers = max(1, count // 10)
+        names = (
+            [f"lt-admin-{i}" for i in range(n_admins)]
+            + [f"lt-manager-{i}" for i in range(n_managers)]
+            + [f"lt-user-{i}" for i in range(max(0, count - n_admins - n_managers))]
+        )
+        users = User.objects.bulk_create(
+            User(username=name, email=f"{name}@example.com", password=password)
+            for name in names
+        )
+        Membership = User.groups.through
+        Membership.objects.bulk_create(
+            [Membership(user_id=u.pk, group_id=admin.pk) for u in users[:n_admins]]
+            + [
+                Membership(user_id=u.pk, group_id=manager.pk)
+                for u in users[n_admins:n_admins + n_managers]
+            ]
+        )
+        return users
+
+    def create_clients(self, count, requests_per_client):
+        rng = self.rng
+        with explicit_timestamps(Client, ClientRequest):
+            clients = Client.objects.bulk_create(
+                Client(
+                    name=f"Client {i}",
+                    department=rng.choice(WORDS).capitalize(),
+                    created_at=self.when(),
+                )
+                for i in range(count)
+            )
+            ClientRequest.objects.bulk_create(
+                (
+                    ClientRequest(
+                        client_id=client.pk,
+                        category=rng.choice(ClientRequest.CATEGORY_CHOICES)[0],
+                        description=self.sentence(rng.randint(5, 40)),
+                        submitted_at=self.when(client.created_at),
+                    )
+                    for client in clients
+                    for _ in range(rng.randint(0, 2 * requests_per_client))
+                ),
+                batch_size=self.batch_size,
+            )
+        return clients
+
+    def when(self, after=None):
+        if after is None:
+            return START + timedelta(seconds=self.rng.uniform(0, self.span))
+        return after + timedelta(seconds=self.rng.expovariate(1 / 86400))
+
+    def sentence(self, words):
+        return " ".join(self.rng.choice(WORDS) for _ in range(words))
+
+    def create_tasks(self, count, department_ids, user_ids):
+        rng = self.rng
+        tasks = []
+        for _ in range(count):
+            created_at = self.when()
+            tasks.append(Task(
+                title=self.sentence(rng.randint(2, 6)).capitalize(),
+                description=self.sentence(rng.randint(10, 60)),
+                department_id=rng.choice(department_ids),
+                created_by_id=rng.choice(user_ids),
+                assigned_to_id=rng.choice(user_ids) if rng.random() < 0.8 else None,
+                status=rng.choices(("OPEN", "IN_PROGRESS", "DONE"), (3, 2, 5))[0],
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+        return Task.objects.bulk_create(tasks, batch_size=self.batch_size)
+
+    def create_history(self, tasks, user_ids, options):
+        rng = self.rng
+        logs, comments = [], []
+        for task in tasks:
+            when = task.created_at
+            for _ in range(rng.randint(0, 2 * options["logs_per_task"])):
+                when = self.when(when)
+                status_change = rng.random() < 0.6
+                logs.append(TaskLog(
+                    task_id=task.pk,
+                    user_id=rng.choice(user_ids),
+                    action_type="STATUS_CHANGE" if status_change else "ASSIGNMENT_CHANGE",
+                    old_value="OPEN" if status_change else str(rng.choice(user_ids)),
+                    new_value="IN_PROGRESS" if status_change else str(rng.choice(user_ids)),
+                    created_at=when,
+                ))
+            when = task.created_at
+            for _ in range(rng.randint(0, 2 * options["comments_per_task"])):
+                when = self.when(when)
+                comments.append(TaskComment(
+                    task_id=task.pk,
+                    user_id=rng.choice(user_ids),
+                    comment=self.sentence(rng.randint(3, 30)),
+                    created_at=when,
+                ))
+        TaskLog.objects.bulk_create(logs, batch_size=self.batch_size)
+        TaskComment.objects.bulk_create(comments, batch_size=self.batch_size)
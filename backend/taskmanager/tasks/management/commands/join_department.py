@@ -0,0 +1,27 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import assignment
+from tasks.models import Department
+
+
+class Command(BaseCommand):
+    help = (
+        "Add users to a department's pool for automatic assignment, starting "
+        "from the open tasks they already have there."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("department", type=int, help="Department id.")
+        parser.add_argument("usernames", nargs="+")
+
+    def handle(self, *args, department, usernames, **options):
+        if not Department.objects.filter(pk=department).exists():
+            raise CommandError(f"No department with id {department}.")
+        users = dict(User.objects.filter(username__in=usernames).values_list("username", "pk"))
+        missing = [name for name in usernames if name not in users]
+        if missing:
+            raise CommandError(f"Unknown users: {', '.join(missing)}")
+
+        joined = assignment.join(department, list(users.values()))
+        self.stdout.write(f"{joined} users joined, {len(users) - joined} already members.")
@@ -0,0 +1,262 @@
+import json
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from tasks import urls as task_urls
+from tasks.models import ClientRequest, Task
+
+from .generate_load_data import PASSWORD, WORDS
+
+STATUSES = ("OPEN", "IN_PROGRESS", "DONE")
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def sample_ids(queryset, k, rng):
+    """
+    ``k`` ids picked by a seeded reservoir over the pk order, so the same
+    seed and data give the same sample. One index scan and no ORDER BY
+    RANDOM() sort; memory stays at ``k`` ids.
+    """
+    sample = []
+    ids = queryset.order_by("pk").values_list("pk", flat=True).iterator(chunk_size=10_000)
+    for i, pk in enumerate(ids):
+        if i < k:
+            sample.append(pk)
+        else:
+            j = rng.randrange(i + 1)
+            if j < k:
+                sample[j] = pk
+    return sample
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive every route in tasks/urls.py plus the JWT token endpoints "
+        "in-process and report latency percentiles, throughput and query "
+        "counts per scenario. Run generate_load_data first. Writes are "
+        "rolled back, so repeated runs see the same data."
+    )
+
+    # route pattern -> scenarios: (name, method, path, payload) built per call.
+    # Long-lived streams are listed with None and reported as skipped.
+    def scenarios(self, rng, task_ids, department_id, client_ids, request_ids):
+        def task():
+            return rng.choice(task_ids)
+
+        def word():
+            return rng.choice(WORDS)
+
+        return {
+            "tasks/": [
+                ("task-list", "get", lambda: ("/api/tasks/", None)),
+                ("task-list-sparse", "get", lambda: (
+                    "/api/tasks/?fields=id,title,status&expand=assigned_to", None
+                )),
+                ("task-create", "post", lambda: ("/api/tasks/", {
+                    "title": f"Load test {word()}", "department": department_id,
+                })),
+            ],
+            "tasks/bulk/": [
+                ("task-bulk-update", "patch", lambda: ("/api/tasks/bulk/", [
+                    {"id": task(), "status": rng.choice(STATUSES)} for _ in range(20)
+                ])),
+            ],
+            "tasks/summary/": [
+                ("task-summary", "get", lambda: ("/api/tasks/summary/", None)),
+            ],
+            "tasks/<int:pk>/": [
+                ("task-detail", "get", lambda: (f"/api/tasks/{task()}/", None)),
+                ("task-update", "patch", lambda: (
+                    f"/api/tasks/{task()}/", {"status": rng.choice(STATUSES)}
+                )),
+            ],
+            "tasks/<int:task_id>/comments/": [
+                ("comment-list", "get", lambda: (f"/api/tasks/{task()}/comments/", None)),
+                ("comment-create", "post", lambda: (
+                    lambda pk: (f"/api/tasks/{pk}/comments/", {"task": pk, "comment": word()})
+                )(task())),
+            ],
+            "tasks/<int:task_id>/logs/": [
+                ("log-list", "get", lambda: (f"/api/tasks/{task()}/logs/", None)),
+            ],
+            "clients/": [
+                ("client-list", "get", lambda: ("/api/clients/", None)),
+            ],
+            "clients/<int:pk>/": [
+                ("client-detail", "get", lambda: (f"/api/clients/{rng.choice(client_ids)}/", None)),
+            ],
+            "client-requests/": [
+                ("client-request-list", "get", lambda: (
+                    "/api/client-requests/?fields=id,category,client&expand=client", None
+                )),
+            ],
+            "client-requests/<int:pk>/": [
+                ("client-request-detail", "get", lambda: (
+                    f"/api/client-requests/{rng.choice(request_ids)}/", None
+                )),
+            ],
+            "search/": [
+                ("search", "get", lambda: (f"/api/search/?q={word()}", None)),
+            ],
+            "export/<slug:name>.<slug:fmt>": [
+                ("export", "get", lambda: ("/api/export/tasks.ndjson", None)),
+            ],
+            "events/": None,
+            "async/tasks/": [
+                ("async-task-list", "get", lambda: ("/api/async/tasks/", None)),
+            ],
+            "async/tasks/<int:pk>/": [
+                ("async-task-detail", "get", lambda: (f"/api/async/tasks/{task()}/", None)),
+            ],
+            "async/tasks/<int:task_id>/comments/": [
+                ("async-comment-list", "get", lambda: (
+                    f"/api/async/tasks/{task()}/comments/", None
+                )),
+            ],
+            "async/tasks/<int:task_id>/logs/": [
+                ("async-log-list", "get", lambda: (f"/api/async/tasks/{task()}/logs/", None)),
+            ],
+        }
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", default="lt-manager-0")
+        parser.add_argument("--password", default=PASSWORD)
+        parser.add_argument("--requests", type=int, default=200, help="Per scenario.")
+        parser.add_argument("--export-requests", type=int, default=2)
+        parser.add_argument("--concurrency", type=int, default=1)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--only", nargs="*", help="Scenario names to run.")
+        parser.add_argument("--output", help="Write the JSON report here.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        task_ids = sample_ids(Task.objects.all(), 1000, rng)
+        if not task_ids:
+            raise CommandError("No tasks found; run generate_load_data first.")
+        department_id = Task.objects.values_list("department_id", flat=True).first()
+        requests = ClientRequest.objects.order_by("pk").values_list("id", "client_id")[:1000]
+        request_ids, client_ids = [r[0] for r in requests], sorted({r[1] for r in requests})
+        if not client_ids or not request_ids:
+            raise CommandError("No clients found; run generate_load_data first.")
+
+        table = self.scenarios(rng, task_ids, department_id, client_ids, request_ids)
+        routes = [str(p.pattern) for p in task_urls.urlpatterns]
+        missing = [r for r in routes if r not in table]
+        if missing:
+            raise CommandError(f"No load scenario for routes: {', '.join(missing)}")
+
+        report = {"options": {k: options[k] for k in ("requests", "concurrency", "seed")}}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            access, report["token"] = self.token_scenarios(options)
+            report["scenarios"], report["skipped"] = [], []
+            for route in routes:
+                if table[route] is None:
+                    report["skipped"].append(route)
+                    continue
+                for name, method, build in table[route]:
+                    if options["only"] and name not in options["only"]:
+                        continue
+                    count = options["export_requests"] if name == "export" else options["requests"]
+                    result = self.run(name, method, build, count, access, options["concurrency"])
+                    report["scenarios"].append(result)
+                    self.print_row(result)
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+
+    def token_scenarios(self, options):
+        credentials = {"username": options["username"], "password": options["password"]}
+        response = Client().post("/api/token/", credentials, content_type="application/json")
+        if response.status_code != 200:
+            raise CommandError(f"Could not obtain a token for {options['username']!r}.")
+        tokens = response.json()
+
+        results = [
+            self.run(
+                "token-obtain", "post", lambda: ("/api/token/", credentials),
+                max(1, options["requests"] // 10), None, options["concurrency"],
+            ),
+            self.run(
+                "token-refresh", "post",
+                lambda: ("/api/token/refresh/", {"refresh": tokens["refresh"]}),
+                options["requests"], None, options["concurrency"],
+            ),
+        ]
+        for result in results:
+            self.print_row(result)
+        return tokens["access"], results
+
+    def run(self, name, method, build, count, access, concurrency):
+        # Drawn up front: the rng is not shared with worker threads, so a
+        # seed gives the same requests at any --concurrency.
+        calls = [build() for _ in range(count)]
+        local = threading.local()
+
+        def one(call):
+            if not hasattr(local, "client"):
+                headers = {"Authorization": f"Bearer {access}"} if access else {}
+                local.client = Client(headers=headers)
+            path, payload = call
+            # Writes run in a transaction that is rolled back afterwards
+            # (on_commit hooks never fire), leaving the data unchanged.
+            with transaction.atomic() if method != "get" else nullcontext():
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    response = getattr(local.client, method)(
+                        path, json.dumps(payload) if payload is not None else None,
+                        content_type="application/json",
+                    )
+                    if response.streaming:
+                        for _ in response.streaming_content:
+                            pass
+                    elapsed = time.perf_counter() - start
+                if method != "get":
+                    transaction.set_rollback(True)
+            return elapsed, len(queries), response.status_code
+
+        start = time.perf_counter()
+        if concurrency == 1:
+            samples = [one(call) for call in calls]
+        else:
+            with ThreadPoolExecutor(concurrency) as pool:
+                samples = list(pool.map(one, calls))
+        wall = time.perf_counter() - start
+
+        latencies = [s[0] * 1000 for s in samples]
+        queries = [s[1] for s in samples]
+        return {
+            "name": name,
+            "method": method.upper(),
+            "requests": count,
+            "errors": sum(1 for s in samples if s[2] >= 400),
+            "throughput_rps": round(count / wall, 2),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "queries_mean": round(sum(queries) / count, 2),
+            "queries_max": max(queries),
+        }
+
+    def print_row(self, r):
+        self.stdout.write(
+            f"{r['name']:<20} {r['method']:<6} {r['requests']:>5} req "
+            f"{r['errors']:>4} err {r['throughput_rps']:>9.1f} rps  "
+            f"p50 {r['p50_ms']:>8.2f}  p95 {r['p95_ms']:>8.2f}  p99 {r['p99_ms']:>8.2f} ms  "
+            f"queries {r['queries_mean']:>6.1f} (max {r['queries_max']})"
+        )
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from tasks import assignment
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconcile the AssigneeLoad index used for automatic assignment with "
+        "the open and in-progress tasks in Task."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only compare the index with a live GROUP BY; do not rewrite it.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["check"]:
+            with transaction.atomic():
+                changed = assignment.rebuild()
+            self.stdout.write(f"Rebuilt assignee load, {changed} rows changed.")
+
+        mismatches = assignment.mismatches()
+        for department_id, user_id, have, want in mismatches:
+            self.stderr.write(
+                f"department {department_id}, user {user_id}: stored {have}, actual {want}"
+            )
+        if mismatches:
+            raise CommandError(f"{len(mismatches)} assignee loads out of sync.")
+        self.stdout.write(self.style.SUCCESS("Assignee load matches the task table."))
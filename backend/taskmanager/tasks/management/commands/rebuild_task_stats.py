@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from tasks import stats
+from tasks.models import TaskStat
+
+
+class Command(BaseCommand):
+    help = "Rebuild the dashboard TaskStat table from Task and verify it."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only compare the table with a live GROUP BY; do not rewrite it.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["check"]:
+            with transaction.atomic():
+                live = stats.live_counts()
+                TaskStat.objects.all().delete()
+                TaskStat.objects.bulk_create(
+                    TaskStat(dimension=dimension, key=key, count=count)
+                    for dimension, counts in live.items()
+                    for key, count in counts.items()
+                )
+            self.stdout.write(f"Rebuilt {TaskStat.objects.count()} counters.")
+
+        stored, live = stats.summary(), stats.live_counts()
+        mismatches = [
+            (dimension, key, stored[dimension].get(key, 0), live[dimension].get(key, 0))
+            for dimension in stats.DIMENSIONS
+            for key in stored[dimension].keys() | live[dimension].keys()
+            if stored[dimension].get(key, 0) != live[dimension].get(key, 0)
+        ]
+        for dimension, key, have, want in sorted(mismatches):
+            self.stderr.write(f"{dimension}={key!r}: stored {have}, actual {want}")
+        if mismatches:
+            raise CommandError(f"{len(mismatches)} counters out of sync.")
+        self.stdout.write(self.style.SUCCESS("Counters match the task table."))
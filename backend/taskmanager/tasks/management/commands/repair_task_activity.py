@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import activity
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Task.comment_count, log_count and last_activity_at from the "
+        "comment and log tables (including archives) and fix any that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drifted tasks; do not rewrite them.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            drifted = list(
+                activity.drifted(Task.objects.order_by("pk")).values_list(
+                    "pk", *activity.FIELDS,
+                    *(f"expected_{field}" for field in activity.FIELDS),
+                )
+            )
+            width = len(activity.FIELDS)
+            for pk, *row in drifted:
+                for field, have, want in zip(activity.FIELDS, row[:width], row[width:]):
+                    if have != want:
+                        self.stderr.write(f"task {pk} {field}: stored {have}, actual {want}")
+            if drifted:
+                raise CommandError(f"{len(drifted)} tasks out of sync.")
+            self.stdout.write(self.style.SUCCESS("Activity counters match the history."))
+            return
+
+        fixed = activity.repair(Task.objects.all(), options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Repaired {len(fixed)} tasks."))
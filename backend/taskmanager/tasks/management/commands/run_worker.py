@@ -0,0 +1,90 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from tasks import archive, intake, jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs from the Job table (e.g. converting client "
+        "requests into tasks), and archive old task history when idle. "
+        "Stops on SIGINT/SIGTERM after the current batch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kinds", nargs="*", help="Job kinds to run (default: all).")
+        parser.add_argument("--batch-size", type=int, help="Override TASKS_JOBS['BATCH_SIZE'].")
+        parser.add_argument("--concurrency", type=int, default=1, help="Worker threads.")
+        parser.add_argument("--poll-interval", type=float, help="Seconds to sleep when idle.")
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is drained.")
+        parser.add_argument(
+            "--backfill",
+            action="store_true",
+            help="First queue every client request that has no task and no pending job.",
+        )
+        parser.add_argument(
+            "--no-archive",
+            action="store_true",
+            help="Don't archive task history when idle (e.g. when cron runs archive_task_history).",
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options["kinds"] or ()) - jobs.HANDLERS.keys()
+        if unknown:
+            raise CommandError(f"Unknown job kinds: {', '.join(sorted(unknown))}")
+        if options["backfill"]:
+            self.stdout.write(f"Queued {intake.enqueue_backlog()} client requests.")
+
+        poll = options["poll_interval"]
+        if poll is None:
+            poll = jobs.config()["POLL_INTERVAL_SECONDS"]
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.totals = [0, 0]
+        if threading.current_thread() is threading.main_thread():
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(sig, lambda *_: self.stop.set())
+
+        if options["concurrency"] == 1:
+            self.loop(options, poll)
+        else:
+            threads = [
+                threading.Thread(target=self.thread, args=(options, poll), daemon=True)
+                for _ in range(options["concurrency"])
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        done, failed = self.totals
+        self.stdout.write(f"{done} jobs done, {failed} failed.")
+
+    def thread(self, options, poll):
+        try:
+            self.loop(options, poll)
+        finally:
+            connection.close()
+
+    def loop(self, options, poll):
+        worker = jobs.worker_name()
+        while not self.stop.is_set():
+            done, failed = jobs.work(worker, options["kinds"], options["batch_size"])
+            with self.lock:
+                self.totals[0] += done
+                self.totals[1] += failed
+            if not done and not failed:
+                if not options["no_archive"]:
+                    self.archive()
+                if options["once"]:
+                    return
+                self.stop.wait(poll)
+
+    def archive(self):
+        moved = archive.run_if_due()
+        if moved:
+            with self.lock:
+                for model, count in moved.items():
+                    self.stdout.write(f"{model}: archived {count} rows.")
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-18 18:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_task_comment_log_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('status', 'Status'), ('department', 'Department'), ('assigned_to', 'Assigned To')], max_length=20)),
+                ('key', models.CharField(blank=True, max_length=64)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'key'), name='taskstat_dimension_key_uniq')],
+            },
+        ),
+    ]
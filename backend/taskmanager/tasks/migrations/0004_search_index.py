@@ -0,0 +1,74 @@
+# Generated by Django 5.2 on 2026-10-18 18:30
+
+from django.db import migrations
+
+# The index as this migration creates it, frozen here so later edits to
+# tasks.search cannot change what an old migration does.
+CONFIG = "english"
+
+INDEXED_FIELDS = {
+    "Task": ("title", "description"),
+    "ClientRequest": ("description",),
+}
+
+
+def _sqlite_statements(table, columns):
+    fts = f"{table}_fts"
+    names = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+        f"{names}, content='{table}', content_rowid='id')",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new}); END",
+    ]
+
+
+def install(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for name, columns in INDEXED_FIELDS.items():
+        model = apps.get_model("tasks", name)
+        if vendor == "postgresql":
+            from django.contrib.postgres.indexes import GinIndex
+            from django.contrib.postgres.search import SearchVector
+
+            schema_editor.add_index(model, GinIndex(
+                SearchVector(*columns, config=CONFIG),
+                name=f"{model._meta.model_name}_search_idx",
+            ))
+        elif vendor == "sqlite":
+            for sql in _sqlite_statements(model._meta.db_table, columns):
+                schema_editor.execute(sql)
+
+
+def uninstall(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for name in INDEXED_FIELDS:
+        model = apps.get_model("tasks", name)
+        if vendor == "postgresql":
+            schema_editor.execute(
+                f"DROP INDEX IF EXISTS {model._meta.model_name}_search_idx"
+            )
+        elif vendor == "sqlite":
+            fts = f"{model._meta.db_table}_fts"
+            schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
+            for suffix in ("ai", "ad", "au"):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_taskstat'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
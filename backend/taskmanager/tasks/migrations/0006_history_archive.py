@@ -0,0 +1,44 @@
+# Generated by Django 5.2 on 2026-10-18 18:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCommentArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('comment', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tasks.task')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['task', 'created_at'], name='commentarch_task_created_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskLogArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('action_type', models.CharField(choices=[('STATUS_CHANGE', 'Status Change'), ('ASSIGNMENT_CHANGE', 'Assignment Change')], max_length=50)),
+                ('old_value', models.CharField(max_length=255)),
+                ('new_value', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField()),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tasks.task')),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['task', 'created_at'], name='tasklogarch_task_created_idx')],
+            },
+        ),
+    ]
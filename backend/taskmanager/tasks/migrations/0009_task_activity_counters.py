@@ -0,0 +1,78 @@
+# Generated by Django 5.2 on 2026-10-18 19:12
+
+import django.utils.timezone
+import tasks.models
+from django.db import migrations, models
+from django.db.models import Count, F, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+
+def backfill(apps, schema_editor):
+    # The counters as tasks.activity computed them when this migration was
+    # written, kept here so later edits to that module cannot change it.
+    Task = apps.get_model("tasks", "Task")
+
+    def aggregate(name, function, field):
+        return Subquery(
+            apps.get_model("tasks", name).objects.filter(task=OuterRef("pk"))
+            .order_by()
+            .values("task")
+            .annotate(value=function(field))
+            .values("value")
+        )
+
+    def total(*names):
+        return sum(
+            (Coalesce(aggregate(name, Count, "pk"), 0) for name in names), Value(0)
+        )
+
+    def latest(*names):
+        return Greatest(
+            F("created_at"),
+            *(Coalesce(aggregate(name, Max, "created_at"), F("created_at")) for name in names),
+        )
+
+    Task.objects.update(
+        comment_count=total("TaskComment", "TaskCommentArchive"),
+        log_count=total("TaskLog", "TaskLogArchive"),
+        last_activity_at=latest("TaskComment", "TaskCommentArchive", "TaskLog", "TaskLogArchive"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_job_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='last_activity_at',
+            field=tasks.models.LastActivityField(default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='log_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['last_activity_at', 'id'], name='task_activity_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['comment_count', 'id'], name='task_comments_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['log_count', 'id'], name='task_logs_id_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-18 19:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_task_activity_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clientrequest',
+            index=models.Index(fields=['submitted_at', 'id'], name='clientreq_submitted_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskcomment',
+            index=models.Index(fields=['created_at', 'id'], name='comment_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasklog',
+            index=models.Index(fields=['created_at', 'id'], name='tasklog_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-18 19:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    from tasks import assignment
+
+    assignment.rebuild(apps.get_model("tasks", "AssigneeLoad"), apps.get_model("tasks", "Task"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_admin_date_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssigneeLoad',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('open_count', models.IntegerField(default=0)),
+                ('accepting', models.BooleanField(default=True)),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tasks.department')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['department', 'accepting', 'open_count', 'user'], name='assigneeload_pick_idx')],
+                'constraints': [models.UniqueConstraint(fields=('department', 'user'), name='assigneeload_dept_user_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
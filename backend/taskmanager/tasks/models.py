@@ -1,5 +1,15 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+
+class LastActivityField(models.DateTimeField):
+    """Starts out equal to the row's ``created_at``, which is set just before."""
+
+    def pre_save(self, model_instance, add):
+        if add and getattr(model_instance, self.attname) is None:
+            setattr(model_instance, self.attname, model_instance.created_at)
+        return super().pre_save(model_instance, add)
 
 
 class Client(models.Model):
@@ -32,6 +42,11 @@ class ClientRequest(models.Model):
     description = models.TextField()
     submitted_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["submitted_at", "id"], name="clientreq_submitted_id_idx"),
+        ]
+
     def __str__(self):
         return self.description[:30]
 
@@ -65,6 +80,13 @@ class Task(models.Model):
         blank=True
     )
 
+    client_request = models.OneToOneField(
+        ClientRequest,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="task",
+    )
 
     status = models.CharField(
         max_length=20,
@@ -73,10 +95,48 @@ class Task(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Maintained by tasks/activity.py; include archived history.
+    comment_count = models.PositiveIntegerField(default=0)
+    log_count = models.PositiveIntegerField(default=0)
+    last_activity_at = LastActivityField()
+
+    ACTIVITY_FIELDS = ("comment_count", "log_count", "last_activity_at")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="task_created_id_idx"),
+            models.Index(fields=["updated_at", "id"], name="task_updated_id_idx"),
+            models.Index(fields=["last_activity_at", "id"], name="task_activity_id_idx"),
+            models.Index(fields=["comment_count", "id"], name="task_comments_id_idx"),
+            models.Index(fields=["log_count", "id"], name="task_logs_id_idx"),
+            # One per list filter, led by the filtered column and ending in
+            # the cursor ordering.
+            models.Index(fields=["status", "created_at"], name="task_status_created_idx"),
+            models.Index(fields=["department", "created_at"], name="task_dept_created_idx"),
+            models.Index(fields=["assigned_to", "created_at"], name="task_assignee_created_idx"),
+            models.Index(fields=["created_by", "created_at"], name="task_creator_created_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # The activity counters only change through F() updates; writing
+        # back the values loaded with the instance would undo increments
+        # made since. Deferred fields were never loaded, so they are left
+        # alone too, except updated_at, which is set rather than read.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields() - {"updated_at"}
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key
+                and f.name not in self.ACTIVITY_FIELDS
+                and f.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
 
 class TaskComment(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE)
@@ -84,6 +144,12 @@ class TaskComment(models.Model):
     comment = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["task", "created_at"], name="comment_task_created_idx"),
+            models.Index(fields=["created_at", "id"], name="comment_created_id_idx"),
+        ]
+
 
 class TaskLog(models.Model):
     ACTION_CHOICES = [
@@ -97,3 +163,145 @@ class TaskLog(models.Model):
     old_value = models.CharField(max_length=255)
     new_value = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["task", "created_at"], name="tasklog_task_created_idx"),
+            models.Index(fields=["created_at", "id"], name="tasklog_created_id_idx"),
+        ]
+
+
+class TaskStat(models.Model):
+    """
+    Running task counts for the dashboard, one row per (dimension, key),
+    e.g. ("status", "OPEN") or ("department", "3"). Kept current by
+    tasks/stats.py; rebuild with ``manage.py rebuild_task_stats``.
+    """
+    DIMENSION_CHOICES = [
+        ("status", "Status"),
+        ("department", "Department"),
+        ("assigned_to", "Assigned To"),
+    ]
+
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    key = models.CharField(max_length=64, blank=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dimension", "key"], name="taskstat_dimension_key_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.dimension}={self.key}: {self.count}"
+
+
+class AssigneeLoad(models.Model):
+    """
+    Open and in-progress tasks assigned to a user within a department.
+    Kept current by tasks/assignment.py; rebuild with
+    ``manage.py rebuild_assignee_load``. A row also makes its user a
+    candidate for automatic assignment in that department unless
+    ``accepting`` is turned off.
+    """
+    department = models.ForeignKey(Department, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    open_count = models.IntegerField(default=0)
+    accepting = models.BooleanField(default=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["department", "user"], name="assigneeload_dept_user_uniq"
+            ),
+        ]
+        indexes = [
+            # The least-loaded candidate is the first entry of this index.
+            models.Index(
+                fields=["department", "accepting", "open_count", "user"],
+                name="assigneeload_pick_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}@{self.department_id}: {self.open_count}"
+
+
+class TokenVersion(models.Model):
+    """
+    The version a user's access tokens must carry for their claims to be
+    trusted (see tasks/authentication.py). Changing it revokes the claims
+    in every token already issued to the user.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    version = models.CharField(max_length=12)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.version}"
+
+
+class TaskCommentArchive(models.Model):
+    """
+    Comments moved out of TaskComment by tasks/archive.py. Rows keep their
+    original id and created_at so pagination across both tables is stable.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    task = models.ForeignKey(Task, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    comment = models.TextField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["task", "created_at"], name="commentarch_task_created_idx"),
+        ]
+
+
+class TaskLogArchive(models.Model):
+    """Log entries moved out of TaskLog; see TaskCommentArchive."""
+    id = models.BigIntegerField(primary_key=True)
+    task = models.ForeignKey(Task, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
+    action_type = models.CharField(max_length=50, choices=TaskLog.ACTION_CHOICES)
+    old_value = models.CharField(max_length=255)
+    new_value = models.CharField(max_length=255)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["task", "created_at"], name="tasklogarch_task_created_idx"),
+        ]
+
+
+class Job(models.Model):
+    """
+    A unit of background work, claimed and run by ``manage.py run_worker``
+    (see tasks/jobs.py). A worker holds a claim until ``locked_until``; a
+    job whose worker died becomes claimable again once that passes.
+    """
+    STATUS_CHOICES = [
+        ("PENDING", "Pending"),
+        ("DONE", "Done"),
+        ("FAILED", "Failed"),
+    ]
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="PENDING")
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="job_status_run_after_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
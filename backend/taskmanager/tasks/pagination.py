@@ -0,0 +1,141 @@
+import json
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+def cursor_columns(view):
+    """Columns ``view``'s paginator may read from rows to build its cursor."""
+    ordering = getattr(view.paginator, "ordering", None) or ()
+    return ["id", *(f.lstrip("-") for f in ordering), *getattr(view, "ordering_fields", ())]
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Keyset pagination over every column of the ordering, not just the first.
+
+    DRF's CursorPagination keys on ``ordering[0]`` and falls back to an
+    OFFSET inside runs of equal values, which grows on non-unique columns
+    such as counters. Here the cursor holds the full position of the last
+    row and the ordering must end in a unique column (``id``), so pages
+    are always a range scan with no offset. Rows whose sort value changes
+    between requests can still move across the cursor, as with any sort
+    on a mutable column.
+    """
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip("-")
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            values.append(str(value))
+        return json.dumps(values)
+
+    def _after(self, position, reverse):
+        """Rows strictly after ``position`` in the (possibly reversed) ordering."""
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        fields = [(f.lstrip("-"), f.startswith("-") != reverse) for f in self.ordering]
+        branches = []
+        for i, (name, descending) in enumerate(fields):
+            equal = {fields[j][0]: values[j] for j in range(i)}
+            branches.append(Q(**equal, **{f"{name}__{'lt' if descending else 'gt'}": values[i]}))
+        # The redundant bound on the first column lets the planner use a
+        # plain index range before checking the tie-breaks.
+        first, descending = fields[0]
+        bound = Q(**{f"{first}__{'lte' if descending else 'gte'}": values[0]})
+        return reduce(and_, [bound, reduce(or_, branches)])
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # DRF's implementation with the single-column filter replaced by
+        # _after(); positions are unique, so the offset stays 0.
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*(
+                f[1:] if f.startswith("-") else f"-{f}" for f in self.ordering
+            ))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            try:
+                queryset = queryset.filter(self._after(current_position, reverse))
+            except (ValidationError, ValueError, TypeError):
+                # A cursor value that does not parse for its column.
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+
+class CreatedAtCursorPagination(KeysetCursorPagination):
+    """
+    Keyset pagination over (created_at, id) by default, or over the
+    ``?ordering=`` the view allows (see filters.TaskOrderingFilter).
+
+    The cursor encodes the last seen position, so every page is an index
+    range scan instead of an OFFSET over the whole table.
+    """
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = ("-created_at", "-id")
+
+
+class SubmittedAtCursorPagination(CreatedAtCursorPagination):
+    """ClientRequest has ``submitted_at`` instead of ``created_at``."""
+    ordering = ("-submitted_at", "-id")
+
+
+class SearchPagination(PageNumberPagination):
+    """Search results are ordered by rank, which has no stable cursor."""
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
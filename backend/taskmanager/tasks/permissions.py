@@ -1,17 +1,26 @@
 from rest_framework.permissions import BasePermission
 
+from .roles import ADMIN, MANAGER, ahas_role, has_role
+
 class IsAdmin(BasePermission):
     def has_permission(self, request, view):
-        return request.user.groups.filter(name="Admin").exists()
+        return has_role(request, ADMIN)
+
+    async def ahas_permission(self, request, view):
+        return await ahas_role(request, ADMIN)
 
 
 class IsManager(BasePermission):
     def has_permission(self, request, view):
-        return request.user.groups.filter(name="Manager").exists()
+        return has_role(request, MANAGER)
+
+    async def ahas_permission(self, request, view):
+        return await ahas_role(request, MANAGER)
 
 
 class IsAdminOrManager(BasePermission):
     def has_permission(self, request, view):
-        return request.user.groups.filter(
-            name__in=["Admin", "Manager"]
-        ).exists()
+        return has_role(request, ADMIN, MANAGER)
+
+    async def ahas_permission(self, request, view):
+        return await ahas_role(request, ADMIN, MANAGER)
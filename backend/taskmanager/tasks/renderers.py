@@ -0,0 +1,73 @@
+"""
+orjson-backed drop-ins for DRF's JSONRenderer and JSONParser.
+
+orjson is optional: without it both classes behave exactly like their
+DRF parents. With it, output matches DRF's compact UTF-8 JSON byte for
+byte apart from float exponents (``1e20`` rather than ``1e+20``); types
+orjson would format differently (datetimes, Decimal, lazy strings, ...)
+are handed to DRF's own encoder.
+"""
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    orjson = None
+
+# Returns plain Python values for orjson to encode.
+_default = JSONEncoder().default
+
+LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+
+
+def dumps(data):
+    ret = orjson.dumps(
+        data,
+        default=_default,
+        option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+    )
+    # Escaped by JSONRenderer so the output is also valid JavaScript.
+    for raw, escaped in LINE_SEPARATORS:
+        if raw in ret:
+            ret = ret.replace(raw, escaped)
+    return ret
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            or not api_settings.COMPACT_JSON
+            or not api_settings.UNICODE_JSON
+            or not api_settings.STRICT_JSON
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return dumps(data)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits; let the stdlib encoder handle it.
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        raw = stream.read() if stream is not None else b""
+        if encoding.lower().replace("-", "") != "utf8":
+            raw = raw.decode(encoding).encode()
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.core.cache import cache
+
+ADMIN = "Admin"
+MANAGER = "Manager"
+
+CACHE_KEY = "tasks:roles:{}"
+
+
+def _timeout():
+    return getattr(settings, "TASKS_ROLE_CACHE_TIMEOUT", 300)
+
+
+def get_roles(user):
+    """
+    Return the set of group names for ``user``.
+
+    Served from the cache until the user's groups change (see signals.py),
+    so the groups table is only queried on a miss. The invalidation only
+    reaches other processes through a shared cache (settings.CACHES); with
+    a local one they see changes after TASKS_ROLE_CACHE_TIMEOUT. Users
+    built from token claims (see authentication.py) already carry their
+    roles.
+    """
+    if not user or not user.is_authenticated:
+        return frozenset()
+    if hasattr(user, "roles"):
+        return user.roles
+
+    key = CACHE_KEY.format(user.pk)
+    roles = cache.get(key)
+    if roles is None:
+        roles = frozenset(user.groups.values_list("name", flat=True))
+        cache.set(key, roles, _timeout())
+    return roles
+
+
+async def aget_roles(user):
+    """Async variant of ``get_roles`` using the async cache and ORM APIs."""
+    if not user or not user.is_authenticated:
+        return frozenset()
+    if hasattr(user, "roles"):
+        return user.roles
+
+    key = CACHE_KEY.format(user.pk)
+    roles = await cache.aget(key)
+    if roles is None:
+        roles = frozenset(
+            [name async for name in user.groups.values_list("name", flat=True)]
+        )
+        await cache.aset(key, roles, _timeout())
+    return roles
+
+
+def request_roles(request):
+    """Like ``get_roles`` but resolved at most once per request."""
+    roles = getattr(request, "_task_roles", None)
+    if roles is None:
+        roles = request._task_roles = get_roles(request.user)
+    return roles
+
+
+async def arequest_roles(request):
+    roles = getattr(request, "_task_roles", None)
+    if roles is None:
+        roles = request._task_roles = await aget_roles(request.user)
+    return roles
+
+
+def has_role(request, *names):
+    return not request_roles(request).isdisjoint(names)
+
+
+async def ahas_role(request, *names):
+    return not (await arequest_roles(request)).isdisjoint(names)
+
+
+def invalidate_roles(*user_ids):
+    cache.delete_many([CACHE_KEY.format(pk) for pk in user_ids])
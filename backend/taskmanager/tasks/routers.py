@@ -0,0 +1,103 @@
+"""
+Read-replica routing for API requests.
+
+Reads made while serving a GET/HEAD/OPTIONS request go to one of
+``TASKS_REPLICA_DATABASES``; everything else, including reads made after
+the request has written, uses the primary. A user
+who wrote is pinned to the primary for ``TASKS_REPLICA_PIN_SECONDS`` so
+they read their own writes despite replication lag. The pin is kept in
+the cache, which must be shared by every process (settings.CACHES;
+check ``tasks.W001`` warns otherwise). Outside of requests
+(management commands, workers) all queries use the primary.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject, empty
+
+PIN_KEY = "tasks:pin-primary:{}"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_state = ContextVar("tasks_db_routing", default=None)
+
+
+def replicas():
+    return getattr(settings, "TASKS_REPLICA_DATABASES", [])
+
+
+def pin_seconds():
+    return getattr(settings, "TASKS_REPLICA_PIN_SECONDS", 5)
+
+
+def _resolved_user(request):
+    """The request's user if already known, without triggering a lookup."""
+    user = request.__dict__.get("user")
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        return None
+    return user
+
+
+class RoutingState:
+    def __init__(self, request):
+        self.request = request
+        self.read_only = request.method in SAFE_METHODS
+        self.wrote = False
+        self._pinned = None
+
+    def pinned(self):
+        if self._pinned is None:
+            user = _resolved_user(self.request)
+            if user is None:
+                return False
+            self._pinned = bool(
+                user.is_authenticated and cache.get(PIN_KEY.format(user.pk))
+            )
+        return self._pinned
+
+
+@contextmanager
+def routing_for(request):
+    token = _state.set(RoutingState(request))
+    try:
+        yield _state.get()
+    finally:
+        _state.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        aliases = replicas()
+        if state is None or not aliases or not state.read_only or state.wrote:
+            return None
+        if state.pinned():
+            return None
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with routing_for(request) as state:
+            response = self.get_response(request)
+
+        if state.wrote and replicas():
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                cache.set(PIN_KEY.format(user.pk), True, pin_seconds())
+        return response
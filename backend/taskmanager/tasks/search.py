@@ -0,0 +1,116 @@
+"""
+Full-text search over Task and ClientRequest.
+
+PostgreSQL uses a GIN index on ``to_tsvector(...)`` of the indexed columns;
+SQLite (local and test setups) uses FTS5 tables kept in sync by triggers.
+Other backends fall back to ``icontains``. django.contrib.postgres is
+imported only on PostgreSQL.
+"""
+from django.db import connections
+from django.db.models import Q
+
+CONFIG = "english"
+
+# (app label, model) -> text columns that are searchable.
+INDEXED_FIELDS = {
+    ("tasks", "Task"): ("title", "description"),
+    ("tasks", "ClientRequest"): ("description",),
+}
+
+
+def _fields(model):
+    return INDEXED_FIELDS[model._meta.app_label, model._meta.object_name]
+
+
+def _vector(model):
+    from django.contrib.postgres.search import SearchVector
+
+    return SearchVector(*_fields(model), config=CONFIG)
+
+
+def _fts_table(model):
+    return f"{model._meta.db_table}_fts"
+
+
+def _fts_query(text):
+    # Quote every term so user input is matched as words, not FTS5 syntax.
+    return " ".join('"%s"' % term.replace('"', '""') for term in text.split())
+
+
+def search(queryset, text):
+    """Narrow ``queryset`` to rows matching ``text``, best matches first."""
+    text = text.strip()
+    if not text:
+        return queryset.none()
+
+    model = queryset.model
+    vendor = connections[queryset.db].vendor
+
+    if vendor == "postgresql":
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        query = SearchQuery(text, config=CONFIG)
+        return queryset.annotate(
+            search=_vector(model), rank=SearchRank(_vector(model), query)
+        ).filter(search=query).order_by("-rank", "-pk")
+
+    if vendor == "sqlite":
+        # Join the FTS table so SQLite drives the query from the MATCH and
+        # reads bm25 from the same row; ORM filters cannot express this.
+        fts, match = _fts_table(model), _fts_query(text)
+        pk = f'"{model._meta.db_table}"."{model._meta.pk.column}"'
+        return queryset.extra(
+            tables=[fts],
+            where=[f"{fts}.rowid = {pk}", f"{fts} MATCH %s"],
+            params=[match],
+            select={"rank": f"-bm25({fts})"},
+        ).order_by("-rank", "-pk")
+
+    condition = Q()
+    for field in _fields(model):
+        condition |= Q(**{f"{field}__icontains": text})
+    return queryset.filter(condition).order_by("-pk")
+
+
+def _sqlite_statements(model, create_table):
+    table, fts = model._meta.db_table, _fts_table(model)
+    columns = ", ".join(_fields(model))
+    new = ", ".join(f"new.{c}" for c in _fields(model))
+    old = ", ".join(f"old.{c}" for c in _fields(model))
+    statements = []
+    if create_table:
+        statements += [
+            f"CREATE VIRTUAL TABLE {fts} USING fts5("
+            f"{columns}, content='{table}', content_rowid='id')",
+            f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        ]
+    statements += [
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old}); END",
+        # Only edits to the indexed text re-index the row; status changes and
+        # counter bumps leave the FTS table alone.
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new}); END",
+    ]
+    return statements
+
+
+def ensure_sqlite_index(connection, models, create=True):
+    """
+    Create the FTS5 tables and their sync triggers if missing.
+
+    Safe to call repeatedly. With ``create=False`` it only restores triggers
+    for existing FTS tables; SQLite drops them whenever a migration rebuilds
+    the underlying table.
+    """
+    existing = set(connection.introspection.table_names())
+    with connection.cursor() as cursor:
+        for model in models:
+            create_table = _fts_table(model) not in existing
+            if create_table and not create:
+                continue
+            for sql in _sqlite_statements(model, create_table):
+                cursor.execute(sql)
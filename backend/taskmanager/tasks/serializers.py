@@ -3,37 +3,65 @@ from django.contrib.auth.models import User
 from .models import (
     Client,
     ClientRequest,
+    Department,
     Task,
     TaskComment,
     TaskLog,
 )
 
 
+class DynamicFieldsMixin:
+    """
+    Accepts ``fields`` (names to keep) and ``expand`` (names from
+    ``expandable_fields`` to render as nested objects instead of ids).
+    The views pass them from ``?fields=`` / ``?expand=`` (see sparse.py).
+    """
+    expandable_fields = {}
+
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in expand:
+            self.fields[name] = self.expandable_fields[name](read_only=True)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ["id", "username", "email"]
 
 
-class ClientSerializer(serializers.ModelSerializer):
+class DepartmentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Department
+        fields = ["id", "name"]
+
+
+class ClientSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Client
         fields = "__all__"
 
 
-class ClientRequestSerializer(serializers.ModelSerializer):
+class ClientRequestSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {"client": ClientSerializer}
+
     class Meta:
         model = ClientRequest
         fields = "__all__"
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {"department": DepartmentSerializer, "assigned_to": UserSerializer}
+
     created_by = serializers.ReadOnlyField(source="created_by.username")
 
     class Meta:
         model = Task
         fields = "__all__"
-        read_only_fields = ["created_by"]
+        read_only_fields = ["created_by", "client_request", *Task.ACTIVITY_FIELDS]
 
     def create(self, validated_data):
         request = self.context["request"]
@@ -62,3 +90,44 @@ class TaskLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = TaskLog
         fields = "__all__"
+
+
+class TaskBulkItemSerializer(serializers.Serializer):
+    """
+    One entry of a bulk task payload.
+
+    Foreign keys are checked against the id sets the view preloads for the
+    whole batch (``department_ids`` / ``user_ids`` in the context) rather
+    than with a query per item.
+    """
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField(allow_blank=True, required=False)
+    department = serializers.IntegerField()
+    assigned_to = serializers.IntegerField(allow_null=True, required=False)
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES, required=False)
+
+    def _check_pk(self, value, ids):
+        if value is not None and value not in ids:
+            raise serializers.ValidationError(
+                f'Invalid pk "{value}" - object does not exist.'
+            )
+        return value
+
+    def validate_department(self, value):
+        return self._check_pk(value, self.context["department_ids"])
+
+    def validate_assigned_to(self, value):
+        return self._check_pk(value, self.context["user_ids"])
+
+
+class TaskBulkUpdateSerializer(TaskBulkItemSerializer):
+    id = serializers.IntegerField()
+
+    def validate_id(self, value):
+        return self._check_pk(value, self.context["tasks"])
+
+    def validate(self, attrs):
+        # Items are validated with partial=True, which also skips "id".
+        if "id" not in attrs:
+            raise serializers.ValidationError({"id": ["This field is required."]})
+        return attrs
@@ -0,0 +1,107 @@
+from django.contrib.auth.models import User
+from django.apps import apps
+from django.db import connections
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_migrate,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from . import activity, assignment, audit, authentication, conditional, events, search, stats
+from .models import ClientRequest, Task, TaskComment
+from .roles import invalidate_roles
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        user_ids = [instance.pk] if action in ("post_add", "post_remove", "post_clear") else []
+    # group.user_set.clear() does not report which users were affected,
+    # so read them before the rows are removed.
+    elif action == "pre_clear":
+        user_ids = list(instance.user_set.values_list("pk", flat=True))
+    elif action in ("post_add", "post_remove"):
+        user_ids = list(pk_set)
+    else:
+        user_ids = []
+
+    if user_ids:
+        invalidate_roles(*user_ids)
+        authentication.revoke(*user_ids)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields, **kwargs):
+    # Logging in only touches last_login; anything else (password,
+    # is_active, username) may invalidate the claims in issued tokens.
+    if not created and set(update_fields or ()) != {"last_login"}:
+        authentication.revoke(instance.pk)
+
+
+@receiver(pre_delete, sender=User)
+def user_deleting(sender, instance, **kwargs):
+    stats.unassign(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    authentication.revoke(instance.pk)
+
+
+@receiver(post_init, sender=Task)
+def task_loaded(sender, instance, **kwargs):
+    audit.snapshot(instance)
+
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, **kwargs):
+    before = None if created else stats.previous(instance)
+    after = stats.values(instance)
+    stats.apply(stats.diff(before, after))
+    assignment.apply(assignment.diff(before, after))
+    if not created:
+        audit.record(audit.changes(instance, getattr(instance, "_audit_user", None)))
+    audit.snapshot(instance)
+    conditional.bump_on_commit(Task)
+    events.publish_on_commit(
+        events.task_event("created" if created else "updated", instance)
+    )
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    stats.apply(stats.diff(stats.previous(instance), None))
+    assignment.apply(assignment.diff(stats.previous(instance), None))
+    conditional.bump_on_commit(Task)
+    events.publish_on_commit(events.task_event("deleted", instance))
+
+
+@receiver(post_save, sender=TaskComment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        activity.comment_added(instance)
+        conditional.bump_on_commit(Task)
+        events.publish_on_commit(events.comment_event(instance))
+
+
+@receiver(post_save, sender=ClientRequest)
+def client_request_saved(sender, instance, created, **kwargs):
+    if created:
+        # Imported here so API workers that never take a client request
+        # do not load the job queue.
+        from . import intake
+
+        intake.enqueue_on_commit(instance)
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    connection = connections[using]
+    if sender.name == "tasks" and connection.vendor == "sqlite":
+        models = [apps.get_model(*key) for key in search.INDEXED_FIELDS]
+        search.ensure_sqlite_index(connection, models, create=False)
@@ -0,0 +1,112 @@
+"""
+Sparse fieldsets: ``?fields=id,title`` and ``?expand=department``.
+
+``fields`` limits the response to the named fields and the SELECT to
+their columns (``.only()``, or the ``.values()`` list on the fast path).
+``expand`` renders a relation listed in the serializer's
+``expandable_fields`` as a nested object and is the only case that joins
+the related table. Both apply to GET/HEAD only; writes always use the
+full serializer.
+"""
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+from .fast_serializers import FastSerializer
+from .pagination import cursor_columns
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+
+
+@lru_cache(maxsize=None)
+def _field_names(serializer_class):
+    return frozenset(serializer_class().fields)
+
+
+@lru_cache(maxsize=256)
+def _fast_variant(serializer_class, fields, expand):
+    return FastSerializer(serializer_class, fields=fields, expand=expand)
+
+
+def _names(request, param):
+    raw = request.query_params.get(param)
+    if not raw:
+        return None
+    return frozenset(name.strip() for name in raw.split(",") if name.strip())
+
+
+def restrict(queryset, serializer, columns=()):
+    """
+    Load only the columns ``serializer`` reads, plus ``columns`` (what the
+    ordering and the cursor read), joining a relation only when a field
+    reaches through it. Falls back to ``queryset`` unchanged if any field
+    reads something other than a concrete model field.
+    """
+    only, related = {queryset.model._meta.pk.name, *columns}, set()
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        attrs = field.source_attrs
+        try:
+            model_field = queryset.model._meta.get_field(attrs[0]) if attrs else None
+        except FieldDoesNotExist:
+            return queryset
+        if model_field is None or not model_field.concrete:
+            return queryset
+        only.add("__".join(attrs))
+        if len(attrs) > 1 or isinstance(field, serializers.BaseSerializer):
+            related.add(attrs[0])
+    return queryset.select_related(None).select_related(*related).only(*only)
+
+
+class SparseFieldsMixin:
+    """Apply ``?fields=`` / ``?expand=`` to a view's queryset and serializer."""
+
+    def sparse_options(self):
+        if not hasattr(self, "_sparse_options"):
+            self._sparse_options = self._parse_sparse_options()
+        return self._sparse_options
+
+    def _parse_sparse_options(self):
+        if self.request.method not in SAFE_METHODS:
+            return {}
+        fields = _names(self.request, FIELDS_PARAM)
+        expand = _names(self.request, EXPAND_PARAM) or frozenset()
+        if fields is None and not expand:
+            return {}
+
+        serializer_class = self.get_serializer_class()
+        unknown = (fields or frozenset()) - _field_names(serializer_class)
+        if unknown:
+            raise ValidationError({FIELDS_PARAM: f"Unknown fields: {', '.join(sorted(unknown))}."})
+        unknown = expand - serializer_class.expandable_fields.keys()
+        if unknown:
+            raise ValidationError({EXPAND_PARAM: f"Cannot expand: {', '.join(sorted(unknown))}."})
+        if fields is not None:
+            fields |= expand
+        return {"fields": fields, "expand": expand}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        options = self.sparse_options()
+        if not options:
+            return queryset
+        # Without the ordering columns, the paginator would load each
+        # deferred one with a query per page edge. Detail views don't page.
+        columns = cursor_columns(self) if hasattr(self, "list") else ()
+        return restrict(queryset, self.get_serializer_class()(**options), columns)
+
+    def get_serializer(self, *args, **kwargs):
+        return super().get_serializer(*args, **self.sparse_options(), **kwargs)
+
+    def get_fast_serializer(self):
+        options = self.sparse_options()
+        if not options:
+            return super().get_fast_serializer()
+        return _fast_variant(
+            self.fast_serializer.serializer_class, options["fields"], options["expand"]
+        )
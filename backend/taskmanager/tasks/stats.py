@@ -0,0 +1,84 @@
+from collections import Counter
+
+from django.db.models import Count, F
+
+from .models import Task, TaskStat
+
+# Summary dimension -> Task attribute it is grouped by.
+DIMENSIONS = {
+    "status": "status",
+    "department": "department_id",
+    "assigned_to": "assigned_to_id",
+}
+
+
+def _key(value):
+    return "" if value is None else str(value)
+
+
+def values(task):
+    return {attr: task.__dict__.get(attr) for attr in DIMENSIONS.values()}
+
+
+def previous(task):
+    """The task's counted values as of when it was loaded."""
+    current = values(task)
+    before = getattr(task, "_audit_snapshot", {})
+    return {attr: before.get(attr, current[attr]) for attr in current}
+
+
+def diff(before, after):
+    """
+    Counter deltas for a task moving from ``before`` to ``after``
+    (dicts from ``values()``; ``None`` for "did not exist").
+    """
+    deltas = Counter()
+    for sign, state in ((-1, before), (1, after)):
+        if state is None:
+            continue
+        for dimension, attr in DIMENSIONS.items():
+            deltas[dimension, _key(state[attr])] += sign
+    return deltas
+
+
+def apply(deltas):
+    for (dimension, key), delta in deltas.items():
+        if not delta:
+            continue
+        rows = TaskStat.objects.filter(dimension=dimension, key=key)
+        if not rows.update(count=F("count") + delta):
+            TaskStat.objects.bulk_create(
+                [TaskStat(dimension=dimension, key=key)], ignore_conflicts=True
+            )
+            rows.update(count=F("count") + delta)
+
+
+def unassign(user_id):
+    """
+    Move ``user_id``'s tasks to the unassigned bucket before the user is
+    deleted: ``assigned_to`` is SET_NULL, an UPDATE that sends no signals.
+    Tasks the user created are deleted with them and counted by their own
+    post_delete.
+    """
+    moved = Task.objects.filter(assigned_to_id=user_id).exclude(created_by_id=user_id).count()
+    apply(Counter({("assigned_to", _key(user_id)): -moved, ("assigned_to", ""): moved}))
+
+
+def summary():
+    result = {dimension: {} for dimension in DIMENSIONS}
+    for dimension, key, count in TaskStat.objects.filter(
+        count__gt=0
+    ).values_list("dimension", "key", "count"):
+        result[dimension][key] = count
+    return result
+
+
+def live_counts():
+    """The same numbers as ``summary()`` computed with GROUP BY on Task."""
+    result = {}
+    for dimension, attr in DIMENSIONS.items():
+        result[dimension] = {
+            _key(row[attr]): row["n"]
+            for row in Task.objects.order_by().values(attr).annotate(n=Count("id"))
+        }
+    return result
@@ -1,3 +1,1471 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import json
+import os
+import random
+import tempfile
+import warnings
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from taskmanager import settings_api
+
+from . import (
+    activity, admin, archive, assignment, audit, authentication, checks, compression, events,
+    export, intake, jobs, stats,
+)
+from .async_views import AsyncListView
+from .fast_serializers import FastSerializer
+from .management.commands.loadtest import sample_ids
+from .models import (
+    AssigneeLoad,
+    Client,
+    ClientRequest,
+    Department,
+    Job,
+    Task,
+    TaskComment,
+    TaskLog,
+    TaskLogArchive,
+    TaskStat,
+)
+from .permissions import IsAdminOrManager
+from .renderers import FastJSONParser, FastJSONRenderer
+from .roles import get_roles
+from .routers import ReplicaRouter, ReplicaRoutingMiddleware, routing_for
+from .serializers import TaskCommentSerializer, TaskLogSerializer, TaskSerializer
+
+
+class TaskAPITestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("alice", password="secret")
+        self.department = Department.objects.create(name="IT")
+        self.client.force_authenticate(self.user)
+
+    def make_task(self, **kwargs):
+        kwargs.setdefault("title", "Task")
+        kwargs.setdefault("department", self.department)
+        kwargs.setdefault("created_by", self.user)
+        return Task.objects.create(**kwargs)
+
+    def log_inserts(self, callbacks):
+        """Run captured on-commit callbacks, returning the TaskLog INSERTs."""
+        with CaptureQueriesContext(connection) as ctx:
+            for callback in callbacks:
+                callback()
+        return [
+            q for q in ctx.captured_queries
+            if q["sql"].startswith('INSERT INTO "tasks_tasklog"')
+        ]
+
+
+class QueryBudgetMixin:
+    """
+    Fails when an endpoint needs more than ``budget`` queries, checked at
+    two data sizes so per-row (N+1) lookups cannot hide behind small fixtures.
+    """
+
+    def assertQueryBudget(self, url, budget, grow, sizes=(2, 20)):
+        for size in sizes:
+            grow(size)
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(
+                len(ctx.captured_queries), budget,
+                f"{url} ran {len(ctx.captured_queries)} queries with {size} "
+                f"rows (budget {budget}):\n"
+                + "\n".join(q["sql"] for q in ctx.captured_queries),
+            )
+
+
+class CursorPaginationTests(TaskAPITestCase):
+    def collect(self, url):
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row["id"] for row in response.data["results"])
+            url = response.data["next"]
+        return seen
+
+    def test_task_list_walks_every_row_once(self):
+        tasks = [self.make_task(title=f"Task {i}") for i in range(7)]
+
+        seen = self.collect("/api/tasks/?page_size=3")
+
+        self.assertEqual(seen, [t.id for t in reversed(tasks)])
+
+    def test_comment_and_log_lists_are_paginated(self):
+        task = self.make_task()
+        for i in range(4):
+            TaskComment.objects.create(task=task, user=self.user, comment=str(i))
+            TaskLog.objects.create(
+                task=task, user=self.user, action_type="STATUS_CHANGE",
+                old_value="OPEN", new_value="DONE",
+            )
+
+        self.assertEqual(len(self.collect(f"/api/tasks/{task.id}/comments/?page_size=3")), 4)
+        self.assertEqual(len(self.collect(f"/api/tasks/{task.id}/logs/?page_size=3")), 4)
+
+
+class QueryBudgetTests(QueryBudgetMixin, TaskAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.task = self.make_task()
+
+    def add_users(self, n):
+        return [
+            User.objects.create_user(f"user-{User.objects.count()}-{i}")
+            for i in range(n)
+        ]
+
+    def test_task_list(self):
+        def grow(n):
+            for user in self.add_users(n):
+                self.make_task(created_by=user, assigned_to=user)
+
+        self.assertQueryBudget("/api/tasks/", 1, grow)
+
+    def test_task_detail(self):
+        # One query for the ETag/Last-Modified validator, one for the row.
+        self.assertQueryBudget(f"/api/tasks/{self.task.id}/", 2, lambda n: None)
+
+    def test_comment_list(self):
+        def grow(n):
+            for user in self.add_users(n):
+                TaskComment.objects.create(task=self.task, user=user, comment="hi")
+
+        # One query each for the hot and archive tables (see archive.py).
+        self.assertQueryBudget(f"/api/tasks/{self.task.id}/comments/", 2, grow)
+
+    def test_log_list(self):
+        def grow(n):
+            for user in self.add_users(n):
+                TaskLog.objects.create(
+                    task=self.task, user=user, action_type="STATUS_CHANGE",
+                    old_value="OPEN", new_value="DONE",
+                )
+
+        self.assertQueryBudget(f"/api/tasks/{self.task.id}/logs/", 2, grow)
+
+
+class RoleCacheTests(TaskAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.manager = Group.objects.create(name="Manager")
+        self.payload = {"title": "New", "department": self.department.id}
+
+    def test_roles_are_cached_between_requests(self):
+        self.user.groups.add(self.manager)
+        self.client.post("/api/tasks/", self.payload)
+
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_roles(user), {"Manager"})
+
+    def test_group_changes_invalidate_cache(self):
+        self.assertEqual(self.client.post("/api/tasks/", self.payload).status_code, 403)
+
+        self.manager.user_set.add(self.user)
+        self.assertEqual(self.client.post("/api/tasks/", self.payload).status_code, 201)
+
+        self.user.groups.clear()
+        self.assertEqual(self.client.post("/api/tasks/", self.payload).status_code, 403)
+
+
+class AuditTrailTests(TaskAPITestCase):
+    def test_patch_writes_one_batched_insert(self):
+        task = self.make_task()
+        bob = User.objects.create_user("bob")
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.patch(
+                f"/api/tasks/{task.id}/",
+                {"status": "DONE", "assigned_to": bob.id},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.log_inserts(callbacks)), 1)
+
+        logs = TaskLog.objects.filter(task=task).order_by("action_type")
+        self.assertEqual(
+            [(log.action_type, log.old_value, log.new_value, log.user_id) for log in logs],
+            [
+                ("ASSIGNMENT_CHANGE", "", str(bob.id), self.user.id),
+                ("STATUS_CHANGE", "OPEN", "DONE", self.user.id),
+            ],
+        )
+
+    def test_unchanged_fields_are_not_logged(self):
+        task = self.make_task()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f"/api/tasks/{task.id}/", {"title": "Renamed"})
+
+        self.assertFalse(TaskLog.objects.filter(task=task).exists())
+
+    def test_collect_batches_many_saves(self):
+        tasks = [self.make_task() for _ in range(3)]
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            with audit.collect():
+                for task in tasks:
+                    task.status = "IN_PROGRESS"
+                    task.save()
+
+        self.assertEqual(len(self.log_inserts(callbacks)), 1)
+        self.assertEqual(TaskLog.objects.count(), 3)
+
+
+class BulkTaskTests(TaskAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user.groups.add(Group.objects.create(name="Manager"))
+
+    def test_bulk_create_reports_invalid_items(self):
+        payload = [
+            {"title": "A", "department": self.department.id},
+            {"title": "B", "department": 9999},
+            {"department": self.department.id},
+            {"title": "C", "department": self.department.id, "status": "DONE"},
+        ]
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post("/api/tasks/bulk/", payload, format="json")
+        department_lookups = [
+            q for q in ctx.captured_queries if 'FROM "tasks_department"' in q["sql"]
+        ]
+        self.assertEqual(len(department_lookups), 1)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([t["title"] for t in response.data["results"]], ["A", "C"])
+        self.assertEqual([e["index"] for e in response.data["errors"]], [1, 2])
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_bulk_update_writes_logs_in_bulk(self):
+        tasks = [self.make_task() for _ in range(3)]
+        bob = User.objects.create_user("bob")
+        payload = [
+            {"id": tasks[0].id, "status": "DONE"},
+            {"id": tasks[1].id, "assigned_to": bob.id},
+            {"id": tasks[2].id, "status": "BOGUS"},
+            {"status": "DONE"},
+        ]
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.patch("/api/tasks/bulk/", payload, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.log_inserts(callbacks)), 1)
+        self.assertEqual([e["index"] for e in response.data["errors"]], [2, 3])
+        self.assertEqual(Task.objects.get(pk=tasks[0].id).status, "DONE")
+        self.assertEqual(Task.objects.get(pk=tasks[1].id).assigned_to, bob)
+        self.assertEqual(Task.objects.get(pk=tasks[2].id).status, "OPEN")
+        self.assertEqual(
+            sorted(TaskLog.objects.values_list("action_type", flat=True)),
+            ["ASSIGNMENT_CHANGE", "STATUS_CHANGE"],
+        )
+
+    def test_requires_list_payload(self):
+        response = self.client.post("/api/tasks/bulk/", {"title": "A"}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class TaskSummaryTests(TaskAPITestCase):
+    def test_summary_follows_writes(self):
+        bob = User.objects.create_user("bob")
+        task = self.make_task()
+        self.make_task(assigned_to=bob)
+        task.status = "DONE"
+        task.assigned_to = bob
+        task.save()
+        self.make_task().delete()
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/tasks/summary/")
+
+        self.assertEqual(response.data, {
+            "status": {"OPEN": 1, "DONE": 1},
+            "department": {str(self.department.id): 2},
+            "assigned_to": {str(bob.id): 2},
+        })
+        self.assertEqual(response.data, stats.live_counts())
+
+    def test_deleting_an_assignee_moves_their_tasks_to_unassigned(self):
+        bob = User.objects.create_user("bob")
+        self.make_task(assigned_to=bob)
+        self.make_task(assigned_to=bob, status="DONE")
+        self.make_task(assigned_to=bob, created_by=bob)
+        self.make_task()
+
+        bob.delete()
+        self.assertEqual(stats.summary()["assigned_to"], {"": 3})
+        self.assertEqual(stats.summary(), stats.live_counts())
+
+    def test_bulk_writes_update_summary(self):
+        self.user.groups.add(Group.objects.create(name="Manager"))
+        self.client.post(
+            "/api/tasks/bulk/",
+            [{"title": "A", "department": self.department.id}] * 3,
+            format="json",
+        )
+        task = Task.objects.first()
+        self.client.patch(
+            "/api/tasks/bulk/", [{"id": task.id, "status": "DONE"}], format="json"
+        )
+
+        self.assertEqual(stats.summary(), stats.live_counts())
+
+    def test_writes_lock_the_rows_they_diff(self):
+        # SQLite drops FOR UPDATE, so check the querysets ask for it.
+        self.user.groups.add(Group.objects.create(name="Manager"))
+        task = self.make_task()
+        lock = QuerySet.select_for_update
+        with mock.patch.object(
+            QuerySet, "select_for_update", autospec=True, side_effect=lock
+        ) as select_for_update:
+            self.client.get(f"/api/tasks/{task.id}/")
+            select_for_update.assert_not_called()
+
+            self.client.patch(f"/api/tasks/{task.id}/", {"status": "DONE"}, format="json")
+            self.client.patch(
+                "/api/tasks/bulk/", [{"id": task.id, "status": "OPEN"}], format="json"
+            )
+            self.client.delete(f"/api/tasks/{task.id}/")
+
+        self.assertEqual(select_for_update.call_count, 3)
+        self.assertEqual(stats.summary(), stats.live_counts())
+
+    def test_rebuild_command_repairs_drift(self):
+        self.make_task()
+        TaskStat.objects.filter(dimension="status").update(count=42)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_task_stats", "--check", stdout=StringIO(), stderr=StringIO())
+
+        call_command("rebuild_task_stats", stdout=StringIO())
+        self.assertEqual(stats.summary(), stats.live_counts())
+
+
+class SearchTests(TaskAPITestCase):
+    def test_tasks_are_ranked_and_kept_in_sync(self):
+        weak = self.make_task(title="Printer", description="office network printer jam")
+        strong = self.make_task(title="Network outage", description="network down")
+        self.make_task(title="Laptop", description="battery")
+
+        response = self.client.get("/api/search/?q=network")
+        self.assertEqual([r["id"] for r in response.data["results"]], [strong.id, weak.id])
+
+        weak.description = "paper jam"
+        weak.save()
+        strong.delete()
+        response = self.client.get("/api/search/?q=network")
+        self.assertEqual(response.data["results"], [])
+
+    def test_client_requests(self):
+        client = Client.objects.create(name="Acme", department="IT")
+        request = ClientRequest.objects.create(
+            client=client, category="NETWORK", description="VPN keeps dropping"
+        )
+
+        response = self.client.get('/api/search/?type=client_request&q=vpn "dropping')
+        self.assertEqual([r["id"] for r in response.data["results"]], [request.id])
+
+    def test_unknown_type(self):
+        self.assertEqual(self.client.get("/api/search/?q=x&type=user").status_code, 400)
+
+    @skipUnless(connection.vendor == "sqlite", "FTS5 triggers are SQLite-only")
+    def test_only_text_edits_reindex(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'")
+            triggers = dict(cursor.fetchall())
+
+        self.assertIn("AFTER UPDATE OF title, description ON", triggers["tasks_task_fts_au"])
+        self.assertIn("AFTER UPDATE OF description ON", triggers["tasks_clientrequest_fts_au"])
+
+
+class ConditionalGetTests(TaskAPITestCase):
+    def test_deploy_check_wants_a_shared_cache(self):
+        self.assertEqual([w.id for w in checks.check_deploy_cache(None)], ["tasks.W002"])
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+        with override_settings(CACHES=redis):
+            self.assertEqual(checks.check_deploy_cache(None), [])
+
+    def test_detail_not_modified_skips_serializer(self):
+        task = self.make_task()
+        url = f"/api/tasks/{task.id}/"
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.client.patch(url, {"title": "Changed"})
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail_last_modified(self):
+        task = self.make_task()
+        url = f"/api/tasks/{task.id}/"
+        last_modified = self.client.get(url)["Last-Modified"]
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_etag_changes_after_commit(self):
+        self.make_task()
+        etag = self.client.get("/api/tasks/")["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertNotEqual(self.client.get("/api/tasks/?page_size=1")["ETag"], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_task()
+        self.assertEqual(
+            self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH=etag).status_code, 200
+        )
+
+
+class ExportTests(TaskAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user.groups.add(Group.objects.create(name="Admin"))
+        self.tasks = [self.make_task(title=f"Task, {i}") for i in range(3)]
+
+    def test_csv_stream(self):
+        response = self.client.get("/api/export/tasks.csv")
+
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(
+            b"".join(response.streaming_content).decode().splitlines()
+        ))
+        self.assertEqual(rows[0], export.EXPORTS["tasks"][1])
+        self.assertEqual([r[1] for r in rows[1:]], [t.title for t in self.tasks])
+
+    def test_ndjson_stream(self):
+        TaskLog.objects.create(
+            task=self.tasks[0], user=self.user, action_type="STATUS_CHANGE",
+            old_value="OPEN", new_value="DONE",
+        )
+        response = self.client.get("/api/export/task-logs.ndjson")
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(json.loads(lines[0])["new_value"], "DONE")
+
+    def test_unknown_export(self):
+        self.assertEqual(self.client.get("/api/export/users.csv").status_code, 404)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("export_data", "tasks", "--format", "ndjson", "--chunk-size", "2", stdout=out)
+
+        self.assertEqual(
+            [json.loads(line)["id"] for line in out.getvalue().splitlines()],
+            [t.id for t in self.tasks],
+        )
+
+
+class TaskEventTests(TaskAPITestCase):
+    def test_writes_publish_after_commit(self):
+        with mock.patch.object(events.broker, "publish") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                task = self.make_task()
+                self.client.post(
+                    f"/api/tasks/{task.id}/comments/", {"task": task.id, "comment": "hi"}
+                )
+                task.delete()
+
+        self.assertEqual(
+            [call.args[0]["type"] for call in publish.call_args_list],
+            ["task.created", "comment.created", "task.deleted"],
+        )
+
+    async def test_stream_only_sends_visible_events(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get("/api/events/")
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b"retry: 3000\n\n")
+
+        events.broker.publish(
+            {"type": "task.updated", "task": 1, "audience": {None}, "data": {}}
+        )
+        events.broker.publish(
+            {"type": "task.updated", "task": 2, "audience": {self.user.pk}, "data": {}}
+        )
+
+        chunk = await asyncio.wait_for(anext(chunks), 1)
+        self.assertEqual(chunk, b'event: task.updated\ndata: {"type": "task.updated", "task": 2, "data": {}}\n\n')
+
+    async def test_stream_requires_authentication(self):
+        response = await self.async_client.get("/api/events/")
+        self.assertEqual(response.status_code, 401)
+        for header in ("Bearer garbage", "Bearer a b"):
+            response = await self.async_client.get("/api/events/", headers={"Authorization": header})
+            self.assertEqual(response.status_code, 401, header)
+
+
+class AsyncViewTests(TaskAPITestCase):
+    async def test_list_matches_sync_serializer(self):
+        tasks = [await sync_to_async(self.make_task)(title=f"T{i}") for i in range(3)]
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get("/api/async/tasks/?page_size=2")
+        page = response.json()
+        self.assertEqual([t["id"] for t in page["results"]], [tasks[2].id, tasks[1].id])
+
+        response = await self.async_client.get(page["next"])
+        page = response.json()
+        self.assertEqual([t["id"] for t in page["results"]], [tasks[0].id])
+        self.assertIsNone(page["next"])
+
+        sync_body = await sync_to_async(
+            lambda: self.client.get(f"/api/tasks/{tasks[0].id}/").content
+        )()
+        response = await self.async_client.get(f"/api/async/tasks/{tasks[0].id}/")
+        self.assertEqual(response.content, sync_body)
+
+    async def test_jwt_and_missing_credentials(self):
+        task = await sync_to_async(self.make_task)()
+        token = str(RefreshToken.for_user(self.user).access_token)
+
+        response = await self.async_client.get(
+            f"/api/async/tasks/{task.id}/logs/", headers={"Authorization": f"Bearer {token}"}
+        )
+        self.assertEqual(response.status_code, 200)
+        response = await self.async_client.get(f"/api/async/tasks/{task.id}/")
+        self.assertEqual(response.status_code, 401)
+        for header in ("Bearer garbage", "Bearer a b"):
+            response = await self.async_client.get("/api/async/tasks/", headers={"Authorization": header})
+            self.assertEqual(response.status_code, 401, header)
+
+    def test_list_view_needs_a_queryset(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "AsyncListView must set queryset"):
+            AsyncListView().get_queryset()
+
+    async def test_async_permission_variant(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        self.assertFalse(await IsAdminOrManager().ahas_permission(request, None))
+
+
+class FastSerializerTests(TaskAPITestCase):
+    def assertSameJSON(self, serializer_class, queryset):
+        fast = FastSerializer(serializer_class)
+        self.assertEqual(
+            JSONRenderer().render(fast.serialize(fast.values(queryset))),
+            JSONRenderer().render(serializer_class(queryset, many=True).data),
+        )
+
+    def test_output_is_byte_identical(self):
+        bob = User.objects.create_user("bob", email="bob@example.com")
+        task = self.make_task(title="Ünïcode", description="", assigned_to=bob)
+        self.make_task(status="DONE")
+        TaskComment.objects.create(task=task, user=bob, comment="hi")
+        TaskLog.objects.create(
+            task=task, user=None, action_type="STATUS_CHANGE",
+            old_value="OPEN", new_value="DONE",
+        )
+
+        self.assertSameJSON(TaskSerializer, Task.objects.order_by("id"))
+        self.assertSameJSON(TaskCommentSerializer, TaskComment.objects.order_by("id"))
+        self.assertSameJSON(TaskLogSerializer, TaskLog.objects.order_by("id"))
+
+    def test_unsupported_field(self):
+        class Custom(TaskSerializer):
+            extra = serializers.SerializerMethodField()
+
+        with self.assertRaises(TypeError):
+            FastSerializer(Custom)
+
+
+class LoadToolingTests(APITestCase):
+    options = ["--tasks", "30", "--users", "12", "--departments", "3",
+               "--logs-per-task", "2", "--comments-per-task", "1", "--clients", "4",
+               "--batch-size", "7"]
+
+    def test_generator_is_deterministic(self):
+        call_command("generate_load_data", *self.options, stdout=StringIO())
+        first = list(Task.objects.order_by("id").values_list("title", "status", "created_at"))
+        counts = (TaskLog.objects.count(), TaskComment.objects.count())
+        self.assertEqual(len(first), 30)
+        self.assertTrue(User.objects.get(username="lt-manager-0").groups.filter(name="Manager").exists())
+
+        Task.objects.all().delete()
+        User.objects.all().delete()
+        Department.objects.all().delete()
+        call_command("generate_load_data", *self.options, stdout=StringIO())
+        second = list(Task.objects.order_by("id").values_list("title", "status", "created_at"))
+        self.assertEqual(first, second)
+        self.assertEqual(counts, (TaskLog.objects.count(), TaskComment.objects.count()))
+
+    def test_loadtest_report(self):
+        call_command("generate_load_data", *self.options, stdout=StringIO())
+        tasks = list(Task.objects.order_by("pk").values_list("pk", "status"))
+        comments = TaskComment.objects.count()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "report.json")
+            call_command("loadtest", "--requests", "2", "--output", path, stdout=StringIO())
+            with open(path) as fh:
+                report = json.load(fh)
+
+        self.assertEqual(report["skipped"], ["events/"])
+        self.assertEqual([r["errors"] for r in report["token"]], [0, 0])
+        for result in report["scenarios"]:
+            self.assertEqual(result["errors"], 0, result["name"])
+            self.assertGreaterEqual(result["p99_ms"], result["p50_ms"])
+        # Writes are rolled back, so the next run starts from the same data.
+        self.assertEqual(list(Task.objects.order_by("pk").values_list("pk", "status")), tasks)
+        self.assertEqual(TaskComment.objects.count(), comments)
+
+    def test_task_sample_is_seeded(self):
+        call_command("generate_load_data", *self.options, stdout=StringIO())
+        ids = list(Task.objects.order_by("pk").values_list("pk", flat=True))
+
+        first = sample_ids(Task.objects.all(), 10, random.Random(7))
+        self.assertEqual(first, sample_ids(Task.objects.all(), 10, random.Random(7)))
+        self.assertNotEqual(first, sample_ids(Task.objects.all(), 10, random.Random(8)))
+        self.assertEqual(len(set(first)), 10)
+        self.assertLessEqual(set(first), set(ids))
+        self.assertEqual(sample_ids(Task.objects.all(), 100, random.Random(7)), ids)
+
+    def test_startup_benchmark(self):
+        out = StringIO()
+        call_command(
+            "bench_startup", "--profiles", settings.SETTINGS_MODULE,
+            "--runs", "1", "--requests", "5", "--top", "3", stdout=out,
+        )
+        report = json.loads(out.getvalue()[out.getvalue().index("["):])
+        self.assertEqual(report[0]["profile"], settings.SETTINGS_MODULE)
+        self.assertGreater(report[0]["modules"], 0)
+        self.assertIn("django", out.getvalue())
+
+
+class RequestTimingTests(TaskAPITestCase):
+    def test_disabled_by_default(self):
+        self.assertNotIn("Server-Timing", self.client.get("/api/tasks/"))
+
+    @override_settings(TASKS_REQUEST_TIMING={"ENABLED": True, "SLOW_REQUEST_MS": 10_000})
+    def test_server_timing_header(self):
+        task = self.make_task()
+
+        header = self.client.get(f"/api/tasks/{task.id}/")["Server-Timing"]
+
+        spans = dict(part.split(";", 1) for part in header.split(", "))
+        self.assertEqual(set(spans), {"db", "auth", "perm", "serialize", "total"})
+        self.assertIn('desc="2 queries"', spans["db"])
+
+    @override_settings(TASKS_REQUEST_TIMING={"ENABLED": True, "SLOW_REQUEST_MS": 0})
+    def test_slow_request_log(self):
+        with self.assertLogs("tasks.requests", "WARNING") as logs:
+            self.client.get("/api/tasks/")
+
+        record = logs.records[0].timing
+        self.assertEqual((record["path"], record["status"]), ("/api/tasks/", 200))
+        self.assertEqual(record["queries"], 1)
+
+    @override_settings(TASKS_REQUEST_TIMING={"ENABLED": True, "SAMPLE_RATE": 0})
+    def test_unsampled_requests_are_untouched(self):
+        self.assertNotIn("Server-Timing", self.client.get("/api/tasks/"))
+
+
+@override_settings(TASKS_REPLICA_DATABASES=["replica"])
+class ReplicaRouterTests(TaskAPITestCase):
+    router = ReplicaRouter()
+
+    def route(self, method, user=None):
+        request = getattr(RequestFactory(), method)("/")
+        request.user = user or self.user
+        return routing_for(request)
+
+    def test_safe_requests_read_from_replica(self):
+        with self.route("get"):
+            self.assertEqual(self.router.db_for_read(Task), "replica")
+            self.router.db_for_write(Task)
+            self.assertIsNone(self.router.db_for_read(Task))
+
+        with self.route("post"):
+            self.assertIsNone(self.router.db_for_read(Task))
+        self.assertIsNone(self.router.db_for_read(Task))
+
+    def test_writers_are_pinned_to_primary(self):
+        middleware = ReplicaRoutingMiddleware(lambda request: self.router.db_for_write(Task))
+        request = RequestFactory().post("/")
+        request.user = self.user
+        middleware(request)
+
+        with self.route("get"):
+            self.assertIsNone(self.router.db_for_read(Task))
+        with self.route("get", User.objects.create_user("bob")):
+            self.assertEqual(self.router.db_for_read(Task), "replica")
+
+    def test_pins_need_a_shared_cache(self):
+        self.assertEqual([w.id for w in checks.check_shared_cache(None)], ["tasks.W001"])
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+        with override_settings(CACHES=redis):
+            self.assertEqual(checks.check_shared_cache(None), [])
+        with override_settings(TASKS_REPLICA_DATABASES=[]):
+            self.assertEqual(checks.check_shared_cache(None), [])
+
+
+HAS_REPLICA = "replica" in settings.DATABASES
+
+
+@skipUnless(HAS_REPLICA, "needs a 'replica' alias, as in taskmanager.settings_test")
+@override_settings(TASKS_REPLICA_DATABASES=["replica"])
+class ReplicaRoutingIntegrationTests(TaskAPITestCase):
+    # The runner sets up the databases of skipped classes too.
+    databases = {"default", "replica"} if HAS_REPLICA else {"default"}
+
+    def setUp(self):
+        super().setUp()
+        User.objects.using("replica").create(id=self.user.id, username="alice")
+        department = Department.objects.using("replica").create(id=self.department.id, name="IT")
+        Task.objects.using("replica").create(
+            title="replica copy", department=department, created_by_id=self.user.id
+        )
+
+    def titles(self):
+        return [t["title"] for t in self.client.get("/api/tasks/").data["results"]]
+
+    def test_reads_follow_writes(self):
+        self.user.groups.add(Group.objects.create(name="Manager"))
+        self.assertEqual(self.titles(), ["replica copy"])
+
+        self.client.post("/api/tasks/", {"title": "primary", "department": self.department.id})
+        self.assertEqual(self.titles(), ["primary"])
+
+
+class ClaimsAuthenticationTests(TaskAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(None)
+        self.user.groups.add(Group.objects.create(name="Manager"))
+        self.make_task()
+
+    def obtain(self):
+        response = self.client.post("/api/token/", {"username": "alice", "password": "secret"})
+        return response.data
+
+    def get_tasks(self, access, url="/api/export/tasks.ndjson"):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, headers={"Authorization": f"Bearer {access}"})
+        auth_queries = [q for q in ctx.captured_queries if 'FROM "auth_' in q["sql"]]
+        return response, auth_queries
+
+    def test_tokens_carry_roles_and_skip_user_queries(self):
+        access = self.obtain()["access"]
+        self.assertEqual(AccessToken(access)["roles"], ["Manager"])
+
+        for url in ("/api/tasks/", "/api/export/tasks.ndjson"):
+            response, auth_queries = self.get_tasks(access, url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(auth_queries, [])
+
+        response = self.client.post(
+            "/api/tasks/", {"title": "From claims", "department": self.department.id},
+            headers={"Authorization": f"Bearer {access}"},
+        )
+        self.assertEqual(Task.objects.get(pk=response.data["id"]).created_by, self.user)
+
+    def test_claims_user_renders_like_the_stored_user(self):
+        self.user.email = "alice@example.com"
+        self.user.save()
+        task = Task.objects.get()
+        headers = {"Authorization": f"Bearer {self.obtain()['access']}"}
+
+        created = self.client.post(
+            f"/api/tasks/{task.id}/comments/", {"task": task.id, "comment": "hi"}, headers=headers
+        ).data
+        listed = self.client.get(f"/api/tasks/{task.id}/comments/", headers=headers).data
+        self.assertEqual(created["user"], listed["results"][0]["user"])
+        self.assertEqual(created["user"]["email"], "alice@example.com")
+
+    def test_group_change_falls_back_to_database(self):
+        access = self.obtain()["access"]
+        self.user.groups.clear()
+
+        response, auth_queries = self.get_tasks(access)
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(auth_queries)
+
+    def test_deactivated_user_is_rejected(self):
+        access = self.obtain()["access"]
+        self.user.is_active = False
+        self.user.save()
+
+        response, _ = self.get_tasks(access)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data["detail"], "User is inactive")
+
+    def test_refresh_reissues_claims(self):
+        tokens = self.obtain()
+        self.user.groups.add(Group.objects.create(name="Admin"))
+
+        access = self.client.post("/api/token/refresh/", {"refresh": tokens["refresh"]}).data["access"]
+        self.assertEqual(AccessToken(access)["roles"], ["Admin", "Manager"])
+        self.assertEqual(self.get_tasks(access)[1], [])
+
+    def test_lost_version_is_read_from_the_database(self):
+        access = self.obtain()["access"]
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.get_tasks(access)[1], [])
+            self.assertEqual(self.get_tasks(access)[1], [])
+        versions = [q for q in ctx.captured_queries if "tasks_tokenversion" in q["sql"]]
+        self.assertEqual(len(versions), 1)
+
+    def test_revocation_survives_a_cache_flush(self):
+        access = self.obtain()["access"]
+        authentication.revoke(self.user.pk)
+        cache.clear()
+
+        response, auth_queries = self.get_tasks(access)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(auth_queries)
+
+    def test_refresh_for_a_deleted_user_is_rejected(self):
+        refresh = self.obtain()["refresh"]
+        self.user.delete()
+
+        response = self.client.post("/api/token/refresh/", {"refresh": refresh})
+        self.assertEqual(response.status_code, 401)
+
+
+class ArchiveTests(TaskAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.task = self.make_task()
+        now = timezone.now()
+        self.logs = TaskLog.objects.bulk_create(
+            TaskLog(task=self.task, user=self.user, action_type="STATUS_CHANGE",
+                    old_value="OPEN", new_value=str(i))
+            for i in range(5)
+        )
+        for days, log in zip((400, 300, 200, 1, 0), self.logs):
+            TaskLog.objects.filter(pk=log.pk).update(created_at=now - timedelta(days=days))
+        self.comment = TaskComment.objects.create(task=self.task, user=self.user, comment="old")
+        TaskComment.objects.filter(pk=self.comment.pk).update(created_at=now - timedelta(days=365))
+
+    def log_ids(self, url):
+        ids = []
+        while url:
+            page = self.client.get(url).data
+            ids += [row["id"] for row in page["results"]]
+            url = page["next"]
+        return ids
+
+    def test_command_moves_rows_in_batches(self):
+        before = self.log_ids(f"/api/tasks/{self.task.id}/logs/")
+
+        out = StringIO()
+        call_command("archive_task_history", "--after-days=30", "--batch-size=2", stdout=out)
+        self.assertIn("TaskLog: archived 3 rows.", out.getvalue())
+        self.assertIn("TaskComment: archived 1 rows.", out.getvalue())
+        self.assertEqual(TaskLog.objects.count(), 2)
+        self.assertEqual(TaskLogArchive.objects.count(), 3)
+
+        self.assertEqual(self.log_ids(f"/api/tasks/{self.task.id}/logs/?page_size=2"), before)
+        comments = self.client.get(f"/api/tasks/{self.task.id}/comments/").data["results"]
+        self.assertEqual([c["comment"] for c in comments], ["old"])
+
+    async def test_async_endpoint_reads_archive(self):
+        await sync_to_async(archive.run)(after_days=30)
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(f"/api/async/tasks/{self.task.id}/logs/?page_size=4")
+        page = response.json()
+        self.assertEqual(
+            [row["id"] for row in page["results"]],
+            [log.id for log in reversed(self.logs[1:])],
+        )
+
+    def test_run_if_due_runs_once_per_interval(self):
+        self.assertEqual(archive.run_if_due(), {"TaskComment": 1, "TaskLog": 3})
+        self.assertIsNone(archive.run_if_due())
+
+    def test_worker_archives_when_idle(self):
+        out = StringIO()
+        call_command("run_worker", "--once", "--no-archive", stdout=out)
+        self.assertEqual(TaskLogArchive.objects.count(), 0)
+
+        call_command("run_worker", "--once", stdout=out)
+        self.assertIn("TaskLog: archived 3 rows.", out.getvalue())
+        self.assertEqual(TaskLogArchive.objects.count(), 3)
+
+    def test_exports_include_archived_rows(self):
+        archive.run(after_days=30)
+        TaskLog.objects.create(task=self.task, user=self.user, action_type="STATUS_CHANGE")
+
+        ids = [row[0] for row in export.rows("task-logs", chunk_size=2)]
+        self.assertEqual(ids, sorted([*(log.id for log in self.logs), ids[-1]]))
+        self.assertEqual(TaskLogArchive.objects.count(), 3)
+        comments = list(export.lines("task-comments", "csv"))
+        self.assertEqual(len(comments), 2)
+        self.assertIn("old", comments[1])
+
+
+class TaskFilterTests(TaskAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.bob = User.objects.create_user("bob")
+        self.other = Department.objects.create(name="HR")
+        self.a = self.make_task(title="A", status="OPEN", assigned_to=self.bob)
+        self.b = self.make_task(title="B", status="DONE", department=self.other)
+        self.c = self.make_task(title="C", status="IN_PROGRESS", created_by=self.bob)
+        Task.objects.filter(pk=self.a.pk).update(created_at=timezone.now() - timedelta(days=10))
+
+    def titles(self, query):
+        response = self.client.get(f"/api/tasks/?{query}")
+        self.assertEqual(response.status_code, 200, response.data)
+        return [t["title"] for t in response.data["results"]]
+
+    def test_filters(self):
+        self.assertEqual(self.titles("status=OPEN,DONE"), ["B", "A"])
+        self.assertEqual(self.titles(f"department={self.other.id}"), ["B"])
+        self.assertEqual(self.titles(f"assigned_to={self.bob.id}"), ["A"])
+        self.assertEqual(self.titles("assigned_to=none"), ["C", "B"])
+        self.assertEqual(self.titles(f"created_by={self.bob.id}&status=IN_PROGRESS"), ["C"])
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        self.assertEqual(self.titles(f"created_after={since}"), ["C", "B"])
+        self.assertEqual(self.titles(f"created_before={since}"), ["A"])
+        with warnings.catch_warnings():
+            # Naive values are made aware instead of warning at query time.
+            warnings.simplefilter("error", RuntimeWarning)
+            self.assertEqual(self.titles(f"created_before={since}T00:00:00"), ["A"])
+
+    def test_invalid_values_are_rejected(self):
+        for query in ("status=LATE", "department=it", "created_after=yesterday",
+                      "created_after=2024-02-30", "created_before=2024-01-01T25:00"):
+            self.assertEqual(self.client.get(f"/api/tasks/?{query}").status_code, 400, query)
+
+    def test_ordering_is_whitelisted_and_paginates(self):
+        Task.objects.filter(pk=self.b.pk).update(updated_at=timezone.now() + timedelta(hours=1))
+        self.assertEqual(self.titles("ordering=-updated_at"), ["B", "C", "A"])
+        self.assertEqual(self.titles("ordering=title"), ["C", "B", "A"])
+
+        response = self.client.get("/api/tasks/?ordering=updated_at&page_size=2")
+        self.assertEqual([t["title"] for t in response.data["results"]], ["A", "C"])
+        response = self.client.get(response.data["next"])
+        self.assertEqual([t["title"] for t in response.data["results"]], ["B"])
+
+    def test_ties_page_by_keyset_without_offset(self):
+        tasks = [self.make_task(title=f"T{i}") for i in range(7)]
+        for task in (self.a, self.b, self.c, *tasks):
+            Task.objects.filter(pk=task.pk).update(comment_count=task.pk % 2)
+        expected = list(
+            Task.objects.order_by("-comment_count", "-id").values_list("title", flat=True)
+        )
+
+        seen, url = [], "/api/tasks/?ordering=-comment_count&page_size=3"
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertNotIn("OFFSET", ctx.captured_queries[-1]["sql"])
+            seen += [t["title"] for t in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(seen, expected)
+
+        previous = self.client.get(response.data["previous"])
+        self.assertEqual([t["title"] for t in previous.data["results"]], expected[6:9])
+        self.assertEqual(self.client.get("/api/tasks/?cursor=bogus").status_code, 404)
+
+
+class SparseFieldsTests(TaskAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.task = self.make_task(description="long text " * 100, assigned_to=self.user)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data, [q["sql"] for q in ctx.captured_queries]
+
+    def test_task_list_selects_only_requested_columns(self):
+        data, queries = self.get("/api/tasks/?fields=id,title")
+        self.assertEqual(data["results"], [{"id": self.task.id, "title": "Task"}])
+        self.assertNotIn("description", queries[-1])
+        self.assertNotIn("JOIN", queries[-1])
+
+        data, queries = self.get("/api/tasks/?fields=id&expand=department,assigned_to")
+        self.assertEqual(data["results"][0]["department"], {"id": self.department.id, "name": "IT"})
+        self.assertEqual(data["results"][0]["assigned_to"]["username"], "alice")
+        self.assertEqual(set(data["results"][0]), {"id", "department", "assigned_to"})
+
+    def test_task_detail(self):
+        data, queries = self.get(f"/api/tasks/{self.task.id}/?fields=title,created_by")
+        self.assertEqual(data, {"title": "Task", "created_by": "alice"})
+        self.assertNotIn("description", queries[-1])
+
+        full = self.client.get(f"/api/tasks/{self.task.id}/")
+        sparse = self.client.get(f"/api/tasks/{self.task.id}/?fields=title")
+        self.assertNotEqual(full["ETag"], sparse["ETag"])
+
+    def test_clients_and_client_requests(self):
+        client = Client.objects.create(name="Acme", department="Sales")
+        request = ClientRequest.objects.create(client=client, category="OTHER", description="help")
+
+        data, _ = self.get("/api/clients/?fields=name")
+        self.assertEqual(data["results"], [{"name": "Acme"}])
+        data, queries = self.get(f"/api/client-requests/{request.id}/?fields=category")
+        self.assertEqual(data, {"category": "OTHER"})
+        self.assertNotIn("description", queries[-1])
+
+        data, queries = self.get("/api/client-requests/?fields=id&expand=client")
+        self.assertEqual(data["results"][0]["client"]["name"], "Acme")
+        self.assertEqual(len(queries), 1)
+
+    def test_cursor_columns_are_loaded_with_the_page(self):
+        client = Client.objects.create(name="Acme", department="Sales")
+        for i in range(3):
+            ClientRequest.objects.create(client=client, category="OTHER", description=str(i))
+
+        data, queries = self.get("/api/client-requests/?fields=category&page_size=2")
+        self.assertEqual(data["results"], [{"category": "OTHER"}] * 2)
+        self.assertIsNotNone(data["next"])
+        # The cursor reads submitted_at; deferring it costs a query per edge.
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("description", queries[0])
+
+    def test_unknown_names_and_writes(self):
+        self.assertEqual(self.client.get("/api/tasks/?fields=secret").status_code, 400)
+        self.assertEqual(self.client.get("/api/tasks/?expand=created_by").status_code, 400)
+
+        self.user.groups.add(Group.objects.create(name="Manager"))
+        response = self.client.post(
+            "/api/tasks/?fields=id", {"title": "New", "department": self.department.id}
+        )
+        self.assertIn("description", response.data)
+
+
+class RendererTests(TestCase):
+    def test_fast_renderer_matches_drf(self):
+        data = {
+            "text": "caf\u00e9 \u2028 \u2029",
+            "when": timezone.now(),
+            "amount": Decimal("1.50"),
+            "lazy": gettext_lazy("Open"),
+            "nested": [{"id": 1, "none": None}],
+            3: True,
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_fast_parser(self):
+        parsed = FastJSONParser().parse(BytesIO('{"title": "café"}'.encode()))
+        self.assertEqual(parsed, {"title": "café"})
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(BytesIO(b"{oops"))
+
+
+class CompressionTests(TaskAPITestCase):
+    def test_negotiation(self):
+        self.assertEqual(compression.negotiate("gzip, br;q=0.5", ["br", "gzip"]), "gzip")
+        self.assertEqual(compression.negotiate("gzip, br", ["br", "gzip"]), "br")
+        self.assertEqual(compression.negotiate("*", ["gzip"]), "gzip")
+        self.assertIsNone(compression.negotiate("gzip;q=0, identity", ["gzip"]))
+        self.assertIsNone(compression.negotiate("", ["gzip"]))
+
+    def test_large_responses_are_compressed(self):
+        for i in range(40):
+            self.make_task(title=f"Task {i}", description="printer on fire " * 10)
+        plain = self.client.get("/api/tasks/")
+        self.assertFalse(plain.has_header("Content-Encoding"))
+
+        response = self.client.get("/api/tasks/", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertTrue(response["ETag"].startswith("W/"))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+        small = self.client.get("/api/tasks/summary/", headers={"Accept-Encoding": "gzip"})
+        self.assertFalse(small.has_header("Content-Encoding"))
+
+    def test_streaming_export_is_compressed_per_chunk(self):
+        self.user.groups.add(Group.objects.create(name="Manager"))
+        for i in range(5):
+            self.make_task(title=f"Task {i}")
+        plain = b"".join(self.client.get("/api/export/tasks.ndjson").streaming_content)
+
+        response = self.client.get("/api/export/tasks.ndjson", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), plain)
+
+    def test_streamed_rows_are_compressed_in_blocks(self):
+        self.user.groups.add(Group.objects.create(name="Manager"))
+        for i in range(40):
+            self.make_task(title=f"Task {i}", description="printer on fire " * 10)
+        plain = b"".join(self.client.get("/api/export/tasks.ndjson").streaming_content)
+        one_shot = compression.compress("gzip", plain, 6)
+
+        # One row per chunk, but the whole export fits in one block.
+        response = self.client.get("/api/export/tasks.ndjson", headers={"Accept-Encoding": "gzip"})
+        parts = [part for part in response.streaming_content if part]
+        self.assertEqual(len(parts), 1)
+        self.assertLessEqual(len(parts[0]), len(one_shot) + 16)
+
+        lines = plain.splitlines(keepends=True)
+        with override_settings(TASKS_COMPRESSION={"STREAM_BUFFER": len(plain) // 4}):
+            middleware = compression.CompressionMiddleware(
+                lambda request: StreamingHttpResponse(iter(lines), content_type="application/x-ndjson")
+            )
+        response = middleware(RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip"))
+        parts = [part for part in response.streaming_content if part]
+        self.assertIn(len(parts), range(4, 7))
+        self.assertEqual(gzip.decompress(b"".join(parts)), plain)
+
+
+class JobQueueTests(TaskAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.acme = Client.objects.create(name="Acme", department="IT")
+
+    def submit(self, **kwargs):
+        kwargs.setdefault("category", "HARDWARE")
+        kwargs.setdefault("description", "Printer jammed\nagain")
+        with self.captureOnCommitCallbacks(execute=True):
+            return ClientRequest.objects.create(client=kwargs.pop("client", self.acme), **kwargs)
+
+    def test_requests_become_tasks_once(self):
+        request = self.submit()
+        other = self.submit(client=Client.objects.create(name="Beta", department="Legal"))
+        self.assertEqual(Job.objects.filter(kind=intake.KIND).count(), 2)
+
+        self.assertEqual(jobs.work("w1"), (2, 0))
+        task = Task.objects.get(client_request=request)
+        self.assertEqual(task.title, "[Hardware] Acme: Printer jammed")
+        self.assertEqual(task.department, self.department)
+        self.assertEqual(task.created_by.username, "intake")
+        self.assertEqual(Task.objects.get(client_request=other).department.name, "Intake")
+        self.assertEqual(stats.summary()["status"]["OPEN"], 2)
+
+        jobs.enqueue(intake.KIND, [{"client_request_id": request.pk}])
+        self.assertEqual(jobs.work("w1"), (1, 0))
+        self.assertEqual(Task.objects.filter(client_request=request).count(), 1)
+
+    def test_claims_do_not_overlap_and_leases_expire(self):
+        jobs.enqueue(intake.KIND, [{"client_request_id": 0}] * 3)
+        first = jobs.claim("w1", [intake.KIND], 2)
+        second = jobs.claim("w2", [intake.KIND], 2)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertEqual(jobs.claim("w3", [intake.KIND], 2), [])
+
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(len(jobs.claim("w3", [intake.KIND], 5)), 3)
+
+    @override_settings(TASKS_JOBS={"MAX_ATTEMPTS": 2, "RETRY_DELAY_SECONDS": 60})
+    def test_failures_are_isolated_and_retried(self):
+        seen = []
+
+        def flaky(batch):
+            seen.append(len(batch))
+            if any(job.payload.get("bad") for job in batch):
+                raise ValueError("bad job")
+
+        with mock.patch.dict(jobs.HANDLERS, {"flaky": flaky}):
+            good, bad = jobs.enqueue("flaky", [{}, {"bad": True}])
+            self.assertEqual(jobs.work("w1", ["flaky"]), (1, 1))
+            self.assertEqual(seen, [2, 1, 1])
+            self.assertEqual(Job.objects.get(pk=good.pk).status, "DONE")
+
+            bad.refresh_from_db()
+            self.assertEqual((bad.status, bad.attempts), ("PENDING", 1))
+            self.assertIn("ValueError: bad job", bad.last_error)
+            self.assertEqual(jobs.work("w1", ["flaky"]), (0, 0))
+
+            Job.objects.filter(pk=bad.pk).update(run_after=timezone.now())
+            self.assertEqual(jobs.work("w1", ["flaky"]), (0, 1))
+            bad.refresh_from_db()
+            self.assertEqual((bad.status, bad.attempts), ("FAILED", 2))
+
+    def test_worker_command_backfills(self):
+        ClientRequest.objects.bulk_create(
+            [ClientRequest(client=self.acme, category="OTHER", description=str(i)) for i in range(3)]
+        )
+        out = StringIO()
+        call_command("run_worker", "--once", "--backfill", "--concurrency", "1", stdout=out)
+        self.assertIn("Queued 3 client requests.", out.getvalue())
+        self.assertIn("3 jobs done, 0 failed.", out.getvalue())
+        self.assertEqual(Task.objects.filter(client_request__isnull=False).count(), 3)
+
+
+class TaskActivityTests(TaskAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.task = self.make_task()
+
+    def test_saving_a_deferred_instance_writes_only_loaded_fields(self):
+        partial = Task.objects.only("id", "title").get(pk=self.task.pk)
+        Task.objects.filter(pk=self.task.pk).update(description="changed elsewhere")
+        partial.title = "Renamed"
+        with CaptureQueriesContext(connection) as ctx:
+            partial.save()
+        task_queries = [q["sql"] for q in ctx.captured_queries if '"tasks_task"' in q["sql"]]
+        # The UPDATE, then one read of the columns the change event needs.
+        self.assertEqual(len(task_queries), 2, task_queries)
+        self.assertTrue(task_queries[0].startswith("UPDATE"))
+        self.assertNotIn("description", task_queries[0])
+
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.title, self.task.description), ("Renamed", "changed elsewhere"))
+
+    def test_comments_and_logs_update_the_counters(self):
+        self.assertEqual(self.task.last_activity_at, self.task.created_at)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f"/api/tasks/{self.task.id}/comments/", {"task": self.task.id, "comment": "hi"}
+            )
+            self.client.patch(f"/api/tasks/{self.task.id}/", {"status": "DONE"})
+
+        data = self.client.get(f"/api/tasks/{self.task.id}/").data
+        self.assertEqual((data["comment_count"], data["log_count"]), (1, 1))
+        latest = TaskLog.objects.get(task=self.task).created_at
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.last_activity_at, latest)
+
+    def test_saving_a_stale_instance_keeps_the_counters(self):
+        stale = Task.objects.get(pk=self.task.pk)
+        TaskComment.objects.create(task=self.task, user=self.user, comment="hi")
+        stale.title = "Renamed"
+        stale.save()
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.title, self.task.comment_count), ("Renamed", 1))
+
+    def test_counters_are_read_only_sortable_and_filterable(self):
+        busy = self.make_task(title="Busy")
+        for _ in range(2):
+            TaskComment.objects.create(task=busy, user=self.user, comment="hi")
+        self.client.patch(f"/api/tasks/{self.task.id}/", {"comment_count": 99})
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.comment_count, 0)
+
+        def titles(query):
+            response = self.client.get(f"/api/tasks/?{query}")
+            self.assertEqual(response.status_code, 200, response.data)
+            return [t["title"] for t in response.data["results"]]
+
+        self.assertEqual(titles("ordering=-comment_count"), ["Busy", "Task"])
+        self.assertEqual(titles("ordering=-last_activity_at"), ["Busy", "Task"])
+        self.assertEqual(titles("min_comments=1"), ["Busy"])
+        since = (timezone.now() - timedelta(minutes=1)).isoformat()
+        self.assertEqual(titles(f"active_before={since.replace('+', '%2B')}"), [])
+        self.assertEqual(self.client.get("/api/tasks/?min_comments=-1").status_code, 400)
+
+    def test_repair_command_fixes_drift_including_archived_rows(self):
+        TaskComment.objects.create(task=self.task, user=self.user, comment="hi")
+        old = timezone.now() - timedelta(days=400)
+        TaskLogArchive.objects.create(
+            id=1, task=self.task, action_type="STATUS_CHANGE", created_at=old
+        )
+        self.assertEqual(list(activity.drifted(Task.objects.all())), [self.task])
+        with self.assertRaisesMessage(CommandError, "1 tasks out of sync."):
+            call_command("repair_task_activity", "--check", stdout=StringIO(), stderr=StringIO())
+
+        out = StringIO()
+        call_command("repair_task_activity", stdout=out)
+        self.assertIn("Repaired 1 tasks.", out.getvalue())
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.comment_count, self.task.log_count), (1, 1))
+        call_command("repair_task_activity", "--check", stdout=StringIO())
+
+
+class AdminTests(QueryBudgetMixin, TaskAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user.is_staff = self.user.is_superuser = True
+        self.user.save()
+        self.client.force_login(self.user)
+
+    def grow(self, n):
+        for i in range(n):
+            user = User.objects.create_user(f"admin-{User.objects.count()}-{i}")
+            task = self.make_task(assigned_to=user)
+            TaskComment.objects.create(task=task, user=user, comment="hi")
+            TaskLog.objects.create(task=task, user=user, action_type="STATUS_CHANGE")
+
+    def test_changelists_run_a_fixed_number_of_queries(self):
+        for model in ("task", "tasklog", "taskcomment"):
+            self.assertQueryBudget(f"/admin/tasks/{model}/", 8, self.grow)
+
+    def test_unfiltered_lists_use_the_table_estimate(self):
+        self.grow(3)
+        with mock.patch.object(admin, "estimated_count", return_value=1_000_000):
+            self.assertEqual(admin.EstimatedCountPaginator(Task.objects.all(), 50).count, 1_000_000)
+            filtered = Task.objects.filter(status="OPEN")
+            self.assertEqual(admin.EstimatedCountPaginator(filtered, 50).count, 3)
+
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get("/admin/tasks/tasklog/")
+            self.assertContains(response, "1000000 task logs")
+            self.assertFalse([q for q in ctx.captured_queries if "COUNT(" in q["sql"]])
+
+        with mock.patch.object(admin, "estimated_count", return_value=None):
+            self.assertEqual(admin.EstimatedCountPaginator(Task.objects.all(), 50).count, 3)
+
+    def test_sqlite_estimate_comes_from_analyze(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("sqlite_stat1 is SQLite-specific")
+        self.grow(3)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.assertEqual(admin.estimated_count(TaskLog, "default"), 3)
+
+    def test_other_admin_pages_render(self):
+        self.grow(1)
+        task = Task.objects.first()
+        for url in (
+            "/admin/tasks/clientrequest/",
+            "/admin/tasks/job/",
+            "/admin/tasks/tasklogarchive/",
+            "/admin/tasks/task/?q=task",
+            f"/admin/tasks/task/?created_at__year={task.created_at.year}",
+            f"/admin/tasks/task/{task.id}/change/",
+            f"/admin/tasks/tasklog/{TaskLog.objects.first().id}/change/",
+        ):
+            self.assertEqual(self.client.get(url).status_code, 200, url)
+
+
+@override_settings(MIDDLEWARE=settings_api.MIDDLEWARE, ROOT_URLCONF=settings_api.ROOT_URLCONF)
+class ApiProfileTests(TaskAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(None)
+        self.make_task()
+
+    def test_jwt_requests_work_without_browser_middleware(self):
+        access = self.client.post(
+            "/api/token/", {"username": "alice", "password": "secret"}, format="json"
+        ).data["access"]
+        for url in ("/api/tasks/", "/api/async/tasks/"):
+            response = self.client.get(url, headers={"Authorization": f"Bearer {access}"})
+            self.assertEqual(response.status_code, 200, url)
+            self.assertEqual(len(response.json()["results"]), 1)
+
+    def test_browser_routes_and_sessions_are_not_served(self):
+        self.assertEqual(self.client.get("/admin/").status_code, 404)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get("/api/async/tasks/").status_code, 401)
+
+
+@override_settings(TASKS_ASSIGNMENT={"AUTO_ASSIGN": True})
+class AssignmentTests(TaskAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user.groups.add(Group.objects.create(name="Manager"))
+        self.bob = User.objects.create_user("bob")
+        self.carol = User.objects.create_user("carol")
+        for user in (self.user, self.bob, self.carol):
+            AssigneeLoad.objects.create(department=self.department, user=user)
+
+    def loads(self):
+        return dict(
+            AssigneeLoad.objects.filter(department=self.department)
+            .values_list("user__username", "open_count")
+        )
+
+    def test_index_follows_task_writes(self):
+        task = self.make_task(assigned_to=self.bob)
+        self.make_task(assigned_to=self.bob, status="IN_PROGRESS")
+        self.make_task(assigned_to=self.carol, status="DONE")
+        self.assertEqual(self.loads(), {"alice": 0, "bob": 2, "carol": 0})
+
+        task.assigned_to = self.carol
+        task.save()
+        self.client.patch(
+            "/api/tasks/bulk/", [{"id": task.id, "status": "DONE"}], format="json"
+        )
+        Task.objects.filter(assigned_to=self.bob).get().delete()
+        self.assertEqual(self.loads(), {"alice": 0, "bob": 0, "carol": 0})
+        self.assertEqual(assignment.mismatches(), [])
+
+    def test_new_tasks_go_to_the_least_loaded_user(self):
+        self.make_task(assigned_to=self.user)
+        self.make_task(assigned_to=self.bob)
+        AssigneeLoad.objects.filter(user=self.carol).update(accepting=False)
+
+        response = self.client.post("/api/tasks/", {"title": "A", "department": self.department.id})
+        self.assertEqual(response.data["assigned_to"], self.user.id)
+        response = self.client.post(
+            "/api/tasks/", {"title": "B", "department": self.department.id, "assigned_to": ""}
+        )
+        self.assertIsNone(response.data["assigned_to"])
+
+        other = Department.objects.create(name="HR")
+        response = self.client.post("/api/tasks/", {"title": "C", "department": other.id})
+        self.assertIsNone(response.data["assigned_to"])
+        self.assertEqual(self.loads(), {"alice": 2, "bob": 1, "carol": 0})
+
+    @override_settings(TASKS_ASSIGNMENT={})
+    def test_off_by_default(self):
+        response = self.client.post("/api/tasks/", {"title": "A", "department": self.department.id})
+        self.assertIsNone(response.data["assigned_to"])
+
+    def test_joining_a_department_makes_a_candidate(self):
+        dave = User.objects.create_user("dave")
+        self.make_task(assigned_to=self.user)
+        Task.objects.bulk_create([
+            Task(title="x", department=self.department, created_by=self.user, assigned_to=dave)
+        ])
+        out = StringIO()
+        call_command("join_department", str(self.department.id), "dave", "bob", stdout=out)
+        self.assertIn("1 users joined, 1 already members.", out.getvalue())
+        self.assertEqual(self.loads()["dave"], 1)
+        self.assertEqual(assignment.mismatches(), [])
+
+        response = self.client.post("/api/tasks/", {"title": "A", "department": self.department.id})
+        self.assertEqual(response.data["assigned_to"], self.bob.id)
+        with self.assertRaisesMessage(CommandError, "Unknown users: erin"):
+            call_command("join_department", str(self.department.id), "erin")
+
+    def test_bulk_create_spreads_tasks_with_one_lookup(self):
+        self.make_task(assigned_to=self.user)
+        payload = [{"title": str(i), "department": self.department.id} for i in range(5)]
+        payload.append({"title": "mine", "department": self.department.id, "assigned_to": None})
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post("/api/tasks/bulk/", payload, format="json")
+        lookups = [q for q in ctx.captured_queries if 'FROM "tasks_assigneeload"' in q["sql"]]
+        self.assertEqual(len(lookups), 1)
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNone(response.data["results"][-1]["assigned_to"])
+        self.assertEqual(self.loads(), {"alice": 2, "bob": 2, "carol": 2})
+
+    def test_rebuild_command_reconciles(self):
+        self.make_task(assigned_to=self.bob)
+        AssigneeLoad.objects.filter(user=self.bob).update(open_count=7)
+        AssigneeLoad.objects.filter(user=self.carol).delete()
+        Task.objects.bulk_create([
+            Task(title="x", department=self.department, created_by=self.user, assigned_to=self.carol)
+        ])
+        with self.assertRaisesMessage(CommandError, "2 assignee loads out of sync."):
+            call_command("rebuild_assignee_load", "--check", stdout=StringIO(), stderr=StringIO())
+
+        out = StringIO()
+        call_command("rebuild_assignee_load", stdout=out)
+        self.assertIn("2 rows changed", out.getvalue())
+        self.assertEqual(self.loads(), {"alice": 0, "bob": 1, "carol": 1})
 
-# Create your tests here.
@@ -1,14 +1,42 @@
 from django.urls import path
+from .async_views import (
+    AsyncTaskListView,
+    AsyncTaskDetailView,
+    AsyncTaskCommentListView,
+    AsyncTaskLogListView,
+)
 from .views import (
+    ClientListCreateView,
+    ClientDetailView,
+    ClientRequestListCreateView,
+    ClientRequestDetailView,
     TaskListCreateView,
+    TaskBulkView,
+    TaskSummaryView,
     TaskDetailView,
     TaskCommentListCreateView,
     TaskLogListView,
+    SearchView,
+    ExportView,
+    TaskEventStreamView,
 )
 
 urlpatterns = [
     path("tasks/", TaskListCreateView.as_view()),
+    path("tasks/bulk/", TaskBulkView.as_view()),
+    path("tasks/summary/", TaskSummaryView.as_view()),
     path("tasks/<int:pk>/", TaskDetailView.as_view()),
     path("tasks/<int:task_id>/comments/", TaskCommentListCreateView.as_view()),
     path("tasks/<int:task_id>/logs/", TaskLogListView.as_view()),
+    path("clients/", ClientListCreateView.as_view()),
+    path("clients/<int:pk>/", ClientDetailView.as_view()),
+    path("client-requests/", ClientRequestListCreateView.as_view()),
+    path("client-requests/<int:pk>/", ClientRequestDetailView.as_view()),
+    path("search/", SearchView.as_view()),
+    path("export/<slug:name>.<slug:fmt>", ExportView.as_view()),
+    path("events/", TaskEventStreamView.as_view()),
+    path("async/tasks/", AsyncTaskListView.as_view()),
+    path("async/tasks/<int:pk>/", AsyncTaskDetailView.as_view()),
+    path("async/tasks/<int:task_id>/comments/", AsyncTaskCommentListView.as_view()),
+    path("async/tasks/<int:task_id>/logs/", AsyncTaskLogListView.as_view()),
 ]
@@ -1,15 +1,41 @@
+import asyncio
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+
 from rest_framework.permissions import SAFE_METHODS
-from rest_framework import generics
+from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.http import condition
+from . import archive, assignment, audit, bulk, conditional, events, export, search, stats
+from .fast_serializers import FastListMixin, FastSerializer
+from .filters import TaskFilter, TaskOrderingFilter
+from .instrumentation import InstrumentedViewMixin
+from .pagination import SearchPagination, SubmittedAtCursorPagination
 from .permissions import IsAdminOrManager
+from .roles import get_roles
+from .sparse import SparseFieldsMixin
 
 
-from .models import Client, ClientRequest, Task, TaskComment, TaskLog
+from .models import Client, ClientRequest, Department, Task, TaskComment, TaskLog
 from .serializers import (
     ClientSerializer,
     ClientRequestSerializer,
     TaskSerializer,
+    TaskBulkItemSerializer,
+    TaskBulkUpdateSerializer,
     TaskCommentSerializer,
     TaskLogSerializer,
 )
@@ -17,20 +43,13 @@ from .serializers import (
 # =======================
 # CLIENT
 # =======================
-class TaskListCreateView(generics.ListCreateAPIView):
-    queryset = Task.objects.all()
-    serializer_class = TaskSerializer
-
-    def get_permissions(self):
-        if self.request.method in SAFE_METHODS:
-            return [IsAuthenticated()]
-        return [IsAuthenticated(), IsAdminOrManager()]
-
-    def perform_create(self, serializer):
-        serializer.save(created_by=self.request.user)
+class ClientListCreateView(InstrumentedViewMixin, SparseFieldsMixin, generics.ListCreateAPIView):
+    queryset = Client.objects.all()
+    serializer_class = ClientSerializer
+    permission_classes = [IsAuthenticated]
 
 
-class ClientDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ClientDetailView(InstrumentedViewMixin, SparseFieldsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Client.objects.all()
     serializer_class = ClientSerializer
     permission_classes = [IsAuthenticated]
@@ -39,13 +58,14 @@ class ClientDetailView(generics.RetrieveUpdateDestroyAPIView):
 # =======================
 # CLIENT REQUEST
 # =======================
-class ClientRequestListCreateView(generics.ListCreateAPIView):
+class ClientRequestListCreateView(InstrumentedViewMixin, SparseFieldsMixin, generics.ListCreateAPIView):
     queryset = ClientRequest.objects.all()
     serializer_class = ClientRequestSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = SubmittedAtCursorPagination
 
 
-class ClientRequestDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ClientRequestDetailView(InstrumentedViewMixin, SparseFieldsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = ClientRequest.objects.all()
     serializer_class = ClientRequestSerializer
     permission_classes = [IsAuthenticated]
@@ -54,30 +74,232 @@ class ClientRequestDetailView(generics.RetrieveUpdateDestroyAPIView):
 # =======================
 # TASK
 # =======================
-class TaskListCreateView(generics.ListCreateAPIView):
-    queryset = Task.objects.all()
+class TaskListCreateView(InstrumentedViewMixin, SparseFieldsMixin, FastListMixin, generics.ListCreateAPIView):
+    queryset = Task.objects.select_related("created_by")
     serializer_class = TaskSerializer
+    fast_serializer = FastSerializer(TaskSerializer)
+    filter_backends = [TaskFilter, TaskOrderingFilter]
+    ordering_fields = [
+        "created_at", "updated_at", "last_activity_at", "comment_count", "log_count",
+    ]
+    ordering = ["-created_at", "-id"]
 
     def get_permissions(self):
         if self.request.method in SAFE_METHODS:
             return [IsAuthenticated()]
         return [IsAuthenticated(), IsAdminOrManager()]
 
-class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Task.objects.all()
+    @method_decorator(condition(etag_func=conditional.task_list_etag))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        data, extra = serializer.validated_data, {}
+        if (
+            assignment.config()["AUTO_ASSIGN"]
+            and "assigned_to" not in data
+            and data.get("status", "OPEN") in assignment.ACTIVE_STATUSES
+        ):
+            extra["assigned_to_id"] = assignment.pick(data["department"].pk)
+        serializer.save(**extra)
+
+class TaskDetailView(InstrumentedViewMixin, SparseFieldsMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = Task.objects.select_related("created_by")
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
 
+    @method_decorator(condition(
+        etag_func=conditional.task_etag,
+        last_modified_func=conditional.task_last_modified,
+    ))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method not in SAFE_METHODS:
+            # Writes diff the loaded row (stats.previous) against the saved
+            # one; the lock keeps a concurrent PATCH from changing it between.
+            queryset = queryset.select_for_update(of=("self",))
+        return queryset
+
+    @transaction.atomic
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
+
+    @transaction.atomic
+    def destroy(self, request, *args, **kwargs):
+        return super().destroy(request, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        serializer.instance._audit_user = self.request.user
+        serializer.save()
+
+
+class TaskBulkView(InstrumentedViewMixin, generics.GenericAPIView):
+    """
+    POST a list of tasks to create them, PATCH a list of ``{"id": ...}``
+    items to update status/assignee/etc. Valid items are written in one
+    transaction; invalid ones are reported by index and skipped.
+    """
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
+    max_items = 1000
+
+    def _ids(self, items, key):
+        return {
+            item[key] for item in items
+            if isinstance(item, dict) and isinstance(item.get(key), int)
+        }
+
+    def _validate(self, serializer_class, items, context, partial=False):
+        valid, errors = [], []
+        for index, item in enumerate(items):
+            serializer = serializer_class(data=item, context=context, partial=partial)
+            if serializer.is_valid():
+                valid.append(serializer.validated_data)
+            else:
+                errors.append({"index": index, "errors": serializer.errors})
+        return valid, errors
+
+    def _items(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            return None, Response(
+                {"detail": "Expected a list of items."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > self.max_items:
+            return None, Response(
+                {"detail": f"At most {self.max_items} items per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return items, None
+
+    def _context(self, items):
+        return {
+            "department_ids": set(
+                Department.objects.filter(
+                    id__in=self._ids(items, "department")
+                ).values_list("id", flat=True)
+            ),
+            "user_ids": set(
+                User.objects.filter(
+                    id__in=self._ids(items, "assigned_to")
+                ).values_list("id", flat=True)
+            ),
+        }
+
+    def post(self, request):
+        items, error = self._items(request)
+        if error:
+            return error
+
+        valid, errors = self._validate(
+            TaskBulkItemSerializer, items, self._context(items)
+        )
+        tasks = [
+            Task(
+                title=data["title"],
+                description=data.get("description", ""),
+                department_id=data["department"],
+                assigned_to_id=data.get("assigned_to"),
+                status=data.get("status", "OPEN"),
+                created_by=request.user,
+            )
+            for data in valid
+        ]
+        if assignment.config()["AUTO_ASSIGN"]:
+            # An explicit "assigned_to": null keeps the task unassigned.
+            assignment.assign([
+                task for task, data in zip(tasks, valid) if "assigned_to" not in data
+            ])
+        with transaction.atomic():
+            bulk.tasks_created(Task.objects.bulk_create(tasks))
+
+        return Response(
+            {"results": TaskSerializer(tasks, many=True).data, "errors": errors},
+            status=(
+                status.HTTP_201_CREATED if tasks or not errors
+                else status.HTTP_400_BAD_REQUEST
+            ),
+        )
+
+    def patch(self, request):
+        items, error = self._items(request)
+        if error:
+            return error
+
+        context = self._context(items)
+        with transaction.atomic(), audit.collect():
+            # Locked like TaskDetailView's writes, so the deltas below are
+            # taken against the values this request actually replaces.
+            context["tasks"] = (
+                Task.objects.select_related("created_by")
+                .select_for_update(of=("self",))
+                .in_bulk(self._ids(items, "id"))
+            )
+            valid, errors = self._validate(
+                TaskBulkUpdateSerializer, items, context, partial=True
+            )
+
+            changed, fields = {}, {"updated_at"}
+            now = timezone.now()
+            for data in valid:
+                task = context["tasks"][data["id"]]
+                for field, value in data.items():
+                    if field == "id":
+                        continue
+                    attname = Task._meta.get_field(field).attname
+                    setattr(task, attname, value)
+                    fields.add(field)
+                task.updated_at = now
+                changed[task.pk] = task
+
+            if changed:
+                Task.objects.bulk_update(changed.values(), sorted(fields))
+                conditional.bump_on_commit(Task)
+            deltas, loads = Counter(), Counter()
+            for task in changed.values():
+                deltas.update(stats.diff(stats.previous(task), stats.values(task)))
+                loads.update(assignment.diff(stats.previous(task), stats.values(task)))
+                audit.record(audit.changes(task, request.user))
+                audit.snapshot(task)
+                events.publish_on_commit(events.task_event("updated", task))
+            stats.apply(deltas)
+            assignment.apply(loads)
+
+        return Response(
+            {
+                "results": TaskSerializer(changed.values(), many=True).data,
+                "errors": errors,
+            },
+            status=(
+                status.HTTP_200_OK if changed or not errors
+                else status.HTTP_400_BAD_REQUEST
+            ),
+        )
+
+
+class TaskSummaryView(InstrumentedViewMixin, generics.GenericAPIView):
+    """Task counts by status, department and assignee (see stats.py)."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(stats.summary())
+
 
 # =======================
 # TASK COMMENTS
 # =======================
-class TaskCommentListCreateView(generics.ListCreateAPIView):
+class TaskCommentListCreateView(InstrumentedViewMixin, FastListMixin, generics.ListCreateAPIView):
     serializer_class = TaskCommentSerializer
+    fast_serializer = FastSerializer(TaskCommentSerializer)
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return TaskComment.objects.filter(task_id=self.kwargs["task_id"])
+        return archive.history(
+            TaskComment, task_id=self.kwargs["task_id"]
+        ).select_related("user")
 
     def perform_create(self, serializer):
         task = get_object_or_404(Task, id=self.kwargs["task_id"])
@@ -87,9 +309,108 @@ class TaskCommentListCreateView(generics.ListCreateAPIView):
 # =======================
 # TASK LOGS
 # =======================
-class TaskLogListView(generics.ListAPIView):
+class TaskLogListView(InstrumentedViewMixin, FastListMixin, generics.ListAPIView):
     serializer_class = TaskLogSerializer
+    fast_serializer = FastSerializer(TaskLogSerializer)
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return TaskLog.objects.filter(task_id=self.kwargs["task_id"])
+        return archive.history(
+            TaskLog, task_id=self.kwargs["task_id"]
+        ).select_related("user")
+
+
+
+# =======================
+# SEARCH
+# =======================
+class SearchView(InstrumentedViewMixin, generics.ListAPIView):
+    """``?q=<words>&type=task|client_request``, ranked by relevance."""
+    permission_classes = [IsAuthenticated]
+    pagination_class = SearchPagination
+    targets = {
+        "task": (Task.objects.select_related("created_by"), TaskSerializer),
+        "client_request": (ClientRequest.objects.all(), ClientRequestSerializer),
+    }
+
+    def get_target(self):
+        kind = self.request.query_params.get("type", "task")
+        if kind not in self.targets:
+            raise ValidationError(
+                {"type": [f"Expected one of: {', '.join(self.targets)}."]}
+            )
+        return self.targets[kind]
+
+    def get_queryset(self):
+        queryset, _ = self.get_target()
+        return search.search(queryset.all(), self.request.query_params.get("q", ""))
+
+    def get_serializer_class(self):
+        return self.get_target()[1]
+
+
+
+# =======================
+# EXPORT
+# =======================
+class ExportView(InstrumentedViewMixin, APIView):
+    """Streams a whole table, e.g. ``export/task-logs.ndjson``."""
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
+
+    def get(self, request, name, fmt):
+        if name not in export.EXPORTS or fmt not in export.FORMATS:
+            raise Http404
+        response = StreamingHttpResponse(
+            export.lines(name, fmt), content_type=export.CONTENT_TYPES[fmt]
+        )
+        response["Content-Disposition"] = f'attachment; filename="{name}.{fmt}"'
+        return response
+
+
+
+# =======================
+# LIVE EVENTS
+# =======================
+def _authenticate(request):
+    """``(user, roles)``, or ``(None, frozenset())`` for rejected credentials."""
+    authenticators = [cls() for cls in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    try:
+        user = Request(request, authenticators=authenticators).user
+    except APIException:
+        # An expired or malformed token; reconnecting clients send these.
+        return None, frozenset()
+    return user, get_roles(user)
+
+
+class TaskEventStreamView(View):
+    """
+    Server-sent events for task and comment changes. Serve under ASGI:
+    each open stream is a coroutine waiting on a queue, not a thread.
+    """
+    keepalive = 15
+
+    async def get(self, request):
+        user, roles = await sync_to_async(_authenticate)(request)
+        if user is None or not user.is_authenticated:
+            return HttpResponse(status=401)
+
+        async def stream():
+            with events.broker.subscribe() as subscription:
+                yield "retry: 3000\n\n"
+                while True:
+                    try:
+                        event = await asyncio.wait_for(
+                            subscription.get(), self.keepalive
+                        )
+                    except asyncio.TimeoutError:
+                        yield ": keepalive\n\n"
+                        continue
+                    if event is None:
+                        return
+                    if events.visible_to(event, user.pk, roles):
+                        yield events.encode(event)
+
+        response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response